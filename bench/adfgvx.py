@@ -0,0 +1,75 @@
+from common import corpus, throughput
+import sys
+import adfgvx
+
+SIZES_MB: list[int] = [1, 10]
+KEY1: str = "na1c3h8tb2ome5wrpd4f6g7i9j0klqsuvxyz"
+KEY2: str = "privacy"
+# the loops are quadratic, they only run on a prefix of this many chars
+REFERENCE_CHARS: int = 100_000
+
+def reference_encrypt(formatted_text: str, key1: str, key2: str, alphabet: str) -> str:
+    # the per-char loop adfgvx.encrypt used before ADFGVXKey
+    matrix: list[list[str]] = adfgvx.create_key_matrix(key1, alphabet)
+    coordinates: str = ''
+    for char in formatted_text:
+        coords: tuple[str, str] = adfgvx.get_coordinates(matrix, char)
+        coordinates += coords[0] + coords[1]
+
+    key_order: list[int] = adfgvx.create_columnar_key(key2)
+    key_length: int = len(key2)
+    columns: list[str] = [coordinates[i::key_length] for i in range(key_length)]
+    return ''.join(columns[i] for i in key_order)
+
+def reference_decrypt(input_text: str, key1: str, key2: str, alphabet: str) -> str:
+    matrix: list[list[str]] = adfgvx.create_key_matrix(key1, alphabet)
+    key_order: list[int] = adfgvx.create_columnar_key(key2)
+    key_length: int = len(key2)
+
+    col_lengths: list[int] = [len(input_text) // key_length] * key_length
+    for i in range(len(input_text) % key_length): col_lengths[i] += 1
+
+    columns: list[str] = [''] * key_length
+    pos: int = 0
+    for i in key_order:
+        columns[i] = input_text[pos:pos+col_lengths[i]]
+        pos += col_lengths[i]
+
+    coordinates: str = ''
+    for i in range(max(col_lengths)):
+        for col in columns:
+            if i >= len(col): continue
+            coordinates += col[i]
+
+    decrypted_text: str = ''
+    for i in range(0, len(coordinates), 2):
+        decrypted_text += matrix["ADFGVX".index(coordinates[i])]["ADFGVX".index(coordinates[i + 1])]
+    return decrypted_text
+
+def main() -> None:
+    sizes: list[int] = [int(arg) for arg in sys.argv[1:]] or SIZES_MB
+    alphabet: str = adfgvx.config["alphabet"]
+    key: adfgvx.ADFGVXKey = adfgvx.compile_key(KEY1, KEY2, alphabet)
+
+    text: str = corpus(REFERENCE_CHARS, alphabet, separator='')
+    reference_speeds: dict[str, float] = {}
+    for name, input_text, reference, compiled in [
+        ("encrypt", text, reference_encrypt, key.encrypt),
+        ("decrypt", key.encrypt(text), reference_decrypt, key.decrypt),
+    ]:
+        reference_speeds[name], expected = throughput(reference, len(input_text), input_text, KEY1, KEY2, alphabet)
+        if compiled(input_text) != expected: raise AssertionError(f"{name} output differs from the loop")
+
+    print(f"loops on {REFERENCE_CHARS} chars, tables on the full size")
+    print(f"{'size':>8} {'operation':>10} {'loop MB/s':>12} {'table MB/s':>12} {'speedup':>9}")
+    for size in sizes:
+        text = corpus(size * 1024 * 1024, alphabet, separator='')
+        encrypt_speed, encrypted_text = throughput(key.encrypt, len(text), text)
+        decrypt_speed, decrypted_text = throughput(key.decrypt, len(encrypted_text), encrypted_text)
+        if decrypted_text != text: raise AssertionError(f"round trip differs at {size} MB")
+
+        for name, speed in [("encrypt", encrypt_speed), ("decrypt", decrypt_speed)]:
+            reference_speed: float = reference_speeds[name]
+            print(f"{size:>6}MB {name:>10} {reference_speed:>12.2f} {speed:>12.1f} {speed / reference_speed:>8.1f}x")
+
+if __name__ == "__main__": main()
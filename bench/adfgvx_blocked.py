@@ -0,0 +1,41 @@
+from time import perf_counter
+from common import corpus
+import argparse
+import tempfile
+import os
+import adfgvx
+
+KEY1: str = "na1c3h8tb2ome5wrpd4f6g7i9j0klqsuvxyz"
+KEY2: str = "privacy"
+WORDS: list[str] = "attack at dawn meet me near the old bridge 1984 2024 42".split(' ')
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="time the blocked adfgvx file mode against the worker count")
+    parser.add_argument("-s", "--size", type=int, default=10, help="plaintext size in MB")
+    parser.add_argument("-b", "--block-size", type=int, default=adfgvx.BLOCK_SIZE, help="formatted chars per block")
+    parser.add_argument("-p", "--processes", type=int, nargs="+", default=[1, 2, 4, os.cpu_count() or 1], help="worker counts to try")
+    args = parser.parse_args()
+
+    alphabet: str = adfgvx.config["alphabet"]
+    with tempfile.TemporaryDirectory() as directory:
+        plain_path: str = os.path.join(directory, "plain.txt")
+        encrypted_path: str = os.path.join(directory, "encrypted.txt")
+        decrypted_path: str = os.path.join(directory, "decrypted.txt")
+        with open(plain_path, "w") as file: file.write(corpus(args.size * 1024 * 1024, WORDS))
+        expected: str = adfgvx.decrypt(adfgvx.encrypt(corpus(args.size * 1024 * 1024, WORDS), KEY1, KEY2, alphabet), KEY1, KEY2, alphabet)
+
+        print(f"{'processes':>9} {'encrypt MB/s':>13} {'decrypt MB/s':>13}")
+        for processes in sorted(set(args.processes)):
+            start: float = perf_counter()
+            adfgvx.encrypt_file(plain_path, encrypted_path, KEY1, KEY2, alphabet, args.block_size, processes)
+            encrypt_seconds: float = perf_counter() - start
+
+            start = perf_counter()
+            adfgvx.decrypt_file(encrypted_path, decrypted_path, KEY1, KEY2, alphabet, processes)
+            decrypt_seconds: float = perf_counter() - start
+
+            with open(decrypted_path, "r") as file:
+                if file.read() != expected: raise AssertionError(f"round trip differs with {processes} processes")
+            print(f"{processes:>9} {args.size / encrypt_seconds:>13.1f} {args.size / decrypt_seconds:>13.1f}")
+
+if __name__ == "__main__": main()
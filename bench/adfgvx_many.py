@@ -0,0 +1,60 @@
+from time import perf_counter
+import argparse
+import random
+import os
+
+# puts src on the path and keeps PySide6 out, before the cipher modules are imported
+import common  # noqa: F401
+import adfgvx
+import adfgx
+
+KEY1: str = "na1c3h8tb2ome5wrpd4f6g7i9j0klqsuvxyz"
+KEY2: str = "privacy"
+WORDS: list[str] = "attack at dawn meet me near the old bridge 1984 2024 42".split(' ')
+
+def messages(count: int, length: int, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    return [' '.join(rng.choices(WORDS, k=length))[:length * 4] for _ in range(count)]
+
+def rate(function, count: int) -> tuple[float, list[str]]:
+    start: float = perf_counter()
+    results: list[str] = function()
+    return count / (perf_counter() - start), results
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="time many short adfgx and adfgvx messages under one key")
+    parser.add_argument("-n", "--messages", type=int, default=100_000, help="messages per run")
+    parser.add_argument("-l", "--length", type=int, default=8, help="words per message")
+    parser.add_argument("-p", "--processes", type=int, nargs="+", default=[1, 2, os.cpu_count() or 1], help="worker counts to try")
+    args = parser.parse_args()
+
+    texts: list[str] = messages(args.messages, args.length)
+    print(f"{'cipher':>7} {'mode':>22} {'encrypt msg/s':>14} {'decrypt msg/s':>14}")
+    for module, key_class in [(adfgx, adfgx.ADFGXKey), (adfgvx, adfgvx.ADFGVXKey)]:
+        alphabet: str = module.config["alphabet"]
+        key1: str = KEY1 if module is adfgvx else KEY1.translate(str.maketrans('', '', "0123456789j"))
+        expected: list[str] = [module.encrypt(text, key1, KEY2, alphabet) for text in texts]
+
+        # the setup every call paid before keys were compiled and cached
+        uncached: list[tuple[str, float, float]] = []
+        sample: int = min(len(texts), 2000)
+        encrypt_rate, _ = rate(lambda: [key_class(key1, KEY2, alphabet).encrypt(module.format_text(text)) for text in texts[:sample]], sample)
+        decrypt_rate, _ = rate(lambda: [key_class(key1, KEY2, alphabet).decrypt(text) for text in expected[:sample]], sample)
+        uncached.append(("key setup per message", encrypt_rate, decrypt_rate))
+
+        encrypt_rate, _ = rate(lambda: [module.encrypt(text, key1, KEY2, alphabet) for text in texts], len(texts))
+        decrypt_rate, _ = rate(lambda: [module.decrypt(text, key1, KEY2, alphabet) for text in expected], len(texts))
+        uncached.append(("cached key per call", encrypt_rate, decrypt_rate))
+
+        for processes in sorted(set(args.processes)):
+            encrypt_rate, encrypted = rate(lambda: list(module.encrypt_many(texts, key1, KEY2, alphabet, processes)), len(texts))
+            decrypt_rate, decrypted = rate(lambda: list(module.decrypt_many(encrypted, key1, KEY2, alphabet, processes)), len(texts))
+            if encrypted != expected: raise AssertionError(f"{module.__name__} encrypt_many differs with {processes} processes")
+            if decrypted != [module.decrypt(text, key1, KEY2, alphabet) for text in expected]:
+                raise AssertionError(f"{module.__name__} decrypt_many differs with {processes} processes")
+            uncached.append((f"many, {processes} processes", encrypt_rate, decrypt_rate))
+
+        for name, encrypt_rate, decrypt_rate in uncached:
+            print(f"{module.__name__:>7} {name:>22} {encrypt_rate:>14.0f} {decrypt_rate:>14.0f}")
+
+if __name__ == "__main__": main()
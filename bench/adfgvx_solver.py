@@ -0,0 +1,47 @@
+from statistics import median
+import argparse
+import random
+
+# puts src on the path and keeps PySide6 out, before the cipher modules are imported
+import common  # noqa: F401
+import columnar
+import adfgvx
+import adfgx
+
+TEXT: str = (
+    "It was a bright cold day in April and the clocks were striking thirteen. The old man walked slowly "
+    "along the river bank towards the bridge where he had promised to meet his brother before the market opened. "
+    "Nobody in the village remembered when the two of them had last spoken, but everyone knew the story of the quarrel "
+    "over the farm and the letters that had never been answered."
+)
+KEY_LETTERS: str = "abcdefghiklmnopqrstuvwxyz"
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="time the adfgx and adfgvx key recovery on random keys")
+    parser.add_argument("-n", "--trials", type=int, default=4, help="ciphertexts to break per cipher")
+    parser.add_argument("-l", "--length", type=int, default=len(TEXT), help="plaintext length in chars")
+    parser.add_argument("-k", "--key-lengths", type=int, nargs="+", default=[5, 6, 7, 9], help="transposition key lengths to try")
+    parser.add_argument("-r", "--restarts", type=int, default=8, help="restarts of the substitution solve per candidate")
+    parser.add_argument("-p", "--processes", type=int, default=None, help="worker processes, all cores by default")
+    args = parser.parse_args()
+
+    for module in [adfgx, adfgvx]:
+        alphabet: str = module.config["alphabet"]
+        solved: int = 0
+        times: list[float] = []
+        for trial in range(args.trials):
+            rng = random.Random(trial)
+            key1: str = ''.join(rng.sample(alphabet, len(alphabet)))
+            key2: str = ''.join(rng.sample(KEY_LETTERS, args.key_lengths[trial % len(args.key_lengths)]))
+            encrypted_text: str = module.encrypt(TEXT[:args.length], key1, key2, alphabet)
+
+            result: columnar.SolverResult = module.solve(encrypted_text, alphabet, processes=args.processes, restarts=args.restarts, seed=trial)
+            correct: bool = result.plaintext == module.decrypt(encrypted_text, key1, key2, alphabet)
+            solved += correct
+            times.append(result.seconds)
+            print(f"{module.__name__} trial {trial}: {'solved' if correct else 'failed'} key length {len(key2)} "
+                  f"ioc {result.index_of_coincidence:.4f} score {result.score:.1f} {result.candidates} orders in {result.seconds:.1f} s")
+
+        print(f"{module.__name__} solved {solved}/{args.trials}, median {median(times):.1f} s, max {max(times):.1f} s")
+
+if __name__ == "__main__": main()
@@ -0,0 +1,52 @@
+from common import corpus, throughput
+import sys
+import affine
+
+SIZES_MB: list[int] = [1, 10]
+KEY: tuple[int, int] = (5, 8)
+
+def reference_encrypt(formatted_text: str, a: int, b: int, alphabet: str) -> str:
+    # the per-char loop affine.encrypt used before AffineKey
+    m: int = len(alphabet)
+    encrypted_text: list[str] = []
+    for char in formatted_text:
+        if char in alphabet:
+            x: int = alphabet.index(char)
+            encrypted_text.append(alphabet[(a * x + b) % m])
+        else:
+            encrypted_text.append(char)
+    return ''.join(encrypted_text)
+
+def reference_decrypt(formatted_text: str, a: int, b: int, alphabet: str) -> str:
+    m: int = len(alphabet)
+    a_inv: int | None = affine.modular_inverse(a, m)
+    if a_inv is None: return ''
+    decrypted_text: list[str] = []
+    for char in formatted_text:
+        if char in alphabet:
+            x: int = alphabet.index(char)
+            decrypted_text.append(alphabet[(a_inv * (x - b)) % m])
+        else:
+            decrypted_text.append(char)
+    return ''.join(decrypted_text)
+
+def main() -> None:
+    sizes: list[int] = [int(arg) for arg in sys.argv[1:]] or SIZES_MB
+    alphabet: str = affine.config["alphabet"]
+    a, b = KEY
+    key: affine.AffineKey = affine.compile_key(a, b, alphabet)
+
+    print(f"{'size':>8} {'operation':>10} {'loop MB/s':>12} {'table MB/s':>12} {'speedup':>9}")
+    for size in sizes:
+        text: str = corpus(size * 1024 * 1024, alphabet, separator='')
+        cases = [
+            ("encrypt", reference_encrypt, key.encrypt),
+            ("decrypt", reference_decrypt, key.decrypt),
+        ]
+        for name, reference, compiled in cases:
+            reference_speed, expected = throughput(reference, len(text), text, a, b, alphabet)
+            compiled_speed, result = throughput(compiled, len(text), text)
+            if result != expected: raise AssertionError(f"{name} output differs at {size} MB")
+            print(f"{size:>6}MB {name:>10} {reference_speed:>12.1f} {compiled_speed:>12.1f} {compiled_speed / reference_speed:>8.1f}x")
+
+if __name__ == "__main__": main()
@@ -0,0 +1,29 @@
+from common import throughput
+import random
+import sys
+import columnar
+
+SIZES_MB: list[int] = [10, 100]
+KEY: str = "privacy"
+
+def main() -> None:
+    sizes: list[int] = [int(arg) for arg in sys.argv[1:]] or SIZES_MB
+    transposition: columnar.ColumnarTransposition = columnar.compile_transposition(columnar.columnar_order(KEY))
+
+    print(f"{'size':>8} {'operation':>12} {'slices MB/s':>12} {'numpy MB/s':>12}")
+    for size in sizes:
+        # one byte more than whole rows, so the first column is longer than the rest
+        data: bytes = random.Random(size).randbytes(size * 1024 * 1024 + 1)
+        transposed: bytes = transposition.transpose(data, False)
+        cases = [
+            ("transpose", data, transposition.transpose, transposed),
+            ("untranspose", transposed, transposition.untranspose, data),
+        ]
+        for name, input_data, function, expected in cases:
+            slice_speed, result = throughput(function, len(input_data), input_data, False)
+            if result != expected: raise AssertionError(f"{name} slices differ at {size} MB")
+            numpy_speed, result = throughput(function, len(input_data), input_data, True)
+            if result != expected: raise AssertionError(f"{name} numpy differs at {size} MB")
+            print(f"{size:>6}MB {name:>12} {slice_speed:>12.1f} {numpy_speed:>12.1f}")
+
+if __name__ == "__main__": main()
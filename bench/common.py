@@ -0,0 +1,28 @@
+from typing import Any, Callable, Sequence
+from time import perf_counter
+import random
+import sys
+import os
+
+# every benchmark imports this first, it runs headless against the modules in src
+sys.modules.setdefault("PySide6", None)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+def corpus(size: int, words: Sequence[str], seed: int = 0, separator: str = ' ') -> str:
+    # size chars of random words, an alphabet with no separator gives random chars
+    rng = random.Random(seed)
+    # drawn in bulk, the mean word length says how many words fill the rest
+    mean_length: float = sum(map(len, words)) / len(words) + len(separator)
+    parts: list[str] = []
+    length: int = 0
+    while length < size:
+        part: str = separator.join(rng.choices(words, k=int((size - length) / mean_length) + 1))
+        parts.append(part)
+        length += len(part) + len(separator)
+    return separator.join(parts)[:size]
+
+def throughput(function: Callable[..., Any], size: int, *args: Any) -> tuple[float, Any]:
+    # MB per second of function(*args) over size bytes or chars, and its result
+    start: float = perf_counter()
+    result: Any = function(*args)
+    return size / (1024 * 1024) / (perf_counter() - start), result
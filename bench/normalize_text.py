@@ -0,0 +1,60 @@
+from time import perf_counter
+from common import corpus
+import unicodedata
+import sys
+import text_formatter as tf
+
+SIZES_MB: list[int] = [1, 10, 100]
+SAMPLES: dict[str, str] = {
+    "ascii": "The quick brown fox, 42 times!\t\n  jumps over 7 lazy dogs; attack at dawn. ",
+    "latin": "Příliš žluťoučký kůň úpěl ďábelské ódy 42, the quick brown fox!\t\n  jumps over 7 lazy dogs. ",
+}
+
+def reference_normalize_text(input_text: str, black_list: list[str] | None = None, char_map: dict[str, str] | None = None) -> str:
+    # normalize_text as it was before the compiled normalizer
+    if len(input_text) <= 0: return input_text
+    if black_list is None: black_list = ['\n', '\t', '\r']
+
+    normalized_text: list[str] = [
+        c.lower() for c in input_text.strip()
+        if c not in black_list and (c.isalnum() or c.isspace())
+    ]
+
+    normalized_text = [
+        c for i, c in enumerate(normalized_text)
+        if not c.isspace() or (i == 0 or not normalized_text[i-1].isspace())
+    ]
+
+    if char_map is not None:
+        normalized_text = list(tf.replace_char_map_keys(''.join(normalized_text), char_map))
+
+    normalized_text = [
+        c for c in unicodedata.normalize('NFD', ''.join(normalized_text))
+        if unicodedata.category(c) != 'Mn'
+    ]
+
+    return ''.join(normalized_text)
+
+def measure(function, *args) -> tuple[float, str]:
+    start: float = perf_counter()
+    result: str = function(*args)
+    return perf_counter() - start, result
+
+def main() -> None:
+    sizes: list[int] = [int(arg) for arg in sys.argv[1:]] or SIZES_MB
+    char_map: dict[str, str] = tf.get_char_map()
+
+    # compiling builds the unicode tables once per process, keep it out of the timings
+    compile_time, _ = measure(tf.normalize_text, SAMPLES["latin"], None, char_map)
+    print(f"compile: {compile_time:.3f}s")
+
+    print(f"{'corpus':>8} {'size':>8} {'reference':>12} {'compiled':>12} {'speedup':>9}")
+    for name, sample in SAMPLES.items():
+        for size in sizes:
+            text: str = corpus(size * 1024 * 1024, sample.split(' '))
+            reference_time, expected = measure(reference_normalize_text, text, None, char_map)
+            compiled_time, result = measure(tf.normalize_text, text, None, char_map)
+            if result != expected: raise AssertionError(f"output differs on {name} at {size} MB")
+            print(f"{name:>8} {size:>6}MB {reference_time:>11.3f}s {compiled_time:>11.3f}s {reference_time / compiled_time:>8.1f}x")
+
+if __name__ == "__main__": main()
@@ -0,0 +1,29 @@
+from common import corpus, throughput
+import sys
+import playfair
+
+SIZES_MB: list[int] = [1, 10]
+KEY: str = "monarchy 1984"
+WORDS: list[str] = (
+    "the quick brown fox jumps over the lazy dog attack at dawn meet me near the old bridge "
+    "at 10 30 gate 7 room 221 1984 2024 42 jazz"
+).split(' ')
+
+def main() -> None:
+    sizes: list[int] = [int(arg) for arg in sys.argv[1:]] or SIZES_MB
+    modes: list[tuple[str, str]] = [
+        ("5x5", playfair.config["alphabet"]),
+        ("6x6", playfair.config["alphanumeric_alphabet"]),
+    ]
+
+    print(f"{'size':>8} {'mode':>6} {'expansion':>10} {'encrypt MB/s':>13} {'decrypt MB/s':>13}")
+    for size in sizes:
+        text: str = corpus(size * 1024 * 1024, WORDS)
+        for name, alphabet in modes:
+            # formatted chars per input char, every char of it is encrypted and sent
+            expansion: float = len(playfair.format_text(text, alphabet)) / len(text)
+            encrypt_speed, encrypted_text = throughput(playfair.encrypt, len(text), text, KEY, alphabet)
+            decrypt_speed, _ = throughput(playfair.decrypt, len(encrypted_text), encrypted_text, KEY, alphabet)
+            print(f"{size:>6}MB {name:>6} {expansion:>10.3f} {encrypt_speed:>13.1f} {decrypt_speed:>13.1f}")
+
+if __name__ == "__main__": main()
@@ -0,0 +1,49 @@
+from statistics import median
+import argparse
+import random
+
+# puts src on the path and keeps PySide6 out, before the cipher modules are imported
+import common  # noqa: F401
+import playfair
+
+TEXT: str = (
+    "It was a bright cold day in April and the clocks were striking thirteen. The old man walked slowly "
+    "along the river bank towards the bridge where he had promised to meet his brother before the market opened. "
+    "Nobody in the village remembered when the two of them had last spoken, but everyone knew the story of the quarrel "
+    "over the farm and the letters that had never been answered."
+)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="time the playfair solver on random keys")
+    parser.add_argument("-n", "--trials", type=int, default=4, help="ciphertexts to break")
+    parser.add_argument("-l", "--length", type=int, default=200, help="plaintext length in chars")
+    parser.add_argument("-r", "--restarts", type=int, default=4, help="restarts per ciphertext")
+    parser.add_argument("-p", "--processes", type=int, default=None, help="worker processes, all cores by default")
+    parser.add_argument("-s", "--steps", type=int, default=1000, help="moves per temperature")
+    parser.add_argument("--no-crib", action="store_true", help="start every restart from a random key")
+    args = parser.parse_args()
+
+    alphabet: str = playfair.config["alphabet"]
+    solved: int = 0
+    times: list[float] = []
+    for trial in range(args.trials):
+        key: str = ''.join(random.Random(trial).sample(alphabet, 25))
+        encrypted_text: str = playfair.encrypt(TEXT[:args.length], key, alphabet)
+
+        result: playfair.SolverResult = playfair.solve(
+            encrypted_text, alphabet, restarts=args.restarts, processes=args.processes, steps=args.steps,
+            crib=None if args.no_crib else playfair.SPACE_CRIB, seed=trial,
+            progress=lambda p: print(f"  restart {p.restart}/{p.restarts} score {p.score:.1f} best {p.best_score:.1f} at {p.elapsed:.1f} s"),
+        )
+        correct: bool = result.plaintext == playfair.decrypt(encrypted_text, key, alphabet)
+        solved += correct
+        if correct: times.append(result.time_to_solution)
+        print(f"trial {trial}: {'solved' if correct else 'failed'} key {result.key} score {result.score:.1f} "
+              f"{result.iterations} moves in {result.seconds:.1f} s, best after {result.time_to_solution:.1f} s")
+        print(f"  {result.plaintext[:72]}")
+
+    print(f"solved {solved}/{args.trials}", end='')
+    if len(times) > 0: print(f", time to solution median {median(times):.1f} s, max {max(times):.1f} s", end='')
+    print()
+
+if __name__ == "__main__": main()
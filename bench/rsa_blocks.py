@@ -0,0 +1,25 @@
+from common import corpus, throughput
+import argparse
+import random
+import rsa
+
+WORDS: list[str] = "attack at dawn meet me near the old bridge 1984 2024 42".split(' ')
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="time packed rsa blocks against the legacy 4 char blocks")
+    parser.add_argument("-b", "--bits", type=int, nargs="+", default=[512, 1024, 2048], help="modulus sizes in bits")
+    parser.add_argument("-s", "--size", type=int, default=16, help="message size in KB")
+    args = parser.parse_args()
+
+    text: str = corpus(args.size * 1024, WORDS)
+    print(f"{'bits':>6} {'mode':>7} {'blocks':>7} {'encrypt KB/s':>13} {'decrypt KB/s':>13}")
+    for bit_length in args.bits:
+        random.seed(bit_length)
+        public_key, private_key = rsa.generate_keys(bit_length // 2)
+        for mode in rsa.BLOCK_MODES:
+            encrypt_speed, encrypted = throughput(rsa.encrypt, len(text), text, public_key, mode)
+            decrypt_speed, decrypted = throughput(rsa.decrypt, len(text), encrypted, private_key, mode)
+            if decrypted != text: raise AssertionError(f"{mode} round trip differs at {bit_length} bits")
+            print(f"{bit_length:>6} {mode:>7} {len(encrypted):>7} {encrypt_speed * 1024:>13.1f} {decrypt_speed * 1024:>13.1f}")
+
+if __name__ == "__main__": main()
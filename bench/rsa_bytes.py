@@ -0,0 +1,50 @@
+from common import throughput
+import argparse
+import random
+import rsa
+
+def reference_text_to_numeric(text: str) -> int:
+    # the bit string conversion text_to_numeric used before int.from_bytes
+    return int(''.join(format(ord(char), f'0{rsa.ASCII_BITS}b') for char in text), 2)
+
+def reference_numeric_to_text(number: int) -> str:
+    binary: str = format(number, 'b')
+    padded_binary: str = binary.zfill((len(binary) + rsa.ASCII_BITS - 1) // rsa.ASCII_BITS * rsa.ASCII_BITS)
+    return ''.join(chr(int(padded_binary[i:i+rsa.ASCII_BITS], 2)) for i in range(0, len(padded_binary), rsa.ASCII_BITS))
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="time the byte conversions and the bytes api of rsa")
+    parser.add_argument("-s", "--size", type=int, default=4, help="data size in MB for the conversions")
+    parser.add_argument("-b", "--bits", type=int, default=2048, help="modulus size in bits for the bytes api")
+    parser.add_argument("-k", "--kilobytes", type=int, default=64, help="data size in KB for the bytes api")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    size: int = args.size * 1024 * 1024
+    text: str = rng.randbytes(size).decode("latin-1")
+    print(f"{'conversion':>26} {'bit strings MB/s':>17} {'from_bytes MB/s':>16} {'speedup':>8}")
+    for name, width in [("legacy 4 char blocks", rsa.BLOCK_SIZE), (f"{args.bits} bit blocks", args.bits // 8 - 2)]:
+        chunks: list[str] = [text[i:i+width] for i in range(0, len(text), width)]
+        reference_speed, numbers = throughput(lambda: [reference_text_to_numeric(chunk) for chunk in chunks], size)
+        speed, converted = throughput(lambda: [rsa.text_to_numeric(chunk) for chunk in chunks], size)
+        if converted != numbers: raise AssertionError(f"text_to_numeric differs on {name}")
+        print(f"{name + ' to int':>26} {reference_speed:>17.1f} {speed:>16.1f} {speed / reference_speed:>7.1f}x")
+
+        reference_speed, texts = throughput(lambda: [reference_numeric_to_text(number) for number in numbers], size)
+        speed, converted = throughput(lambda: [rsa.numeric_to_text(number) for number in numbers], size)
+        if converted != texts: raise AssertionError(f"numeric_to_text differs on {name}")
+        print(f"{name + ' to text':>26} {reference_speed:>17.1f} {speed:>16.1f} {speed / reference_speed:>7.1f}x")
+
+    random.seed(args.bits)
+    public_key, private_key = rsa.generate_keys(args.bits // 2)
+    data: bytes = rng.randbytes(args.kilobytes * 1024)
+    encrypt_speed, encrypted = throughput(rsa.encrypt_bytes, len(data), memoryview(data), public_key)
+    decrypt_speed, decrypted = throughput(rsa.decrypt_bytes, len(data), encrypted, private_key)
+    if decrypted != data: raise AssertionError("bytes round trip differs")
+    # strided and multi byte views go through the same packing
+    for view in (memoryview(data)[::3], memoryview(data[:len(data) // 4 * 4]).cast("I")[::-1]):
+        if rsa.decrypt_bytes(rsa.encrypt_bytes(view, public_key), private_key) != view.tobytes():
+            raise AssertionError("bytes round trip of a non contiguous view differs")
+    print(f"{args.bits} bit encrypt_bytes {encrypt_speed * 1024:.1f} KB/s, decrypt_bytes {decrypt_speed * 1024:.1f} KB/s")
+
+if __name__ == "__main__": main()
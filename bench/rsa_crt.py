@@ -0,0 +1,33 @@
+from time import perf_counter
+import argparse
+import random
+
+# puts src on the path and keeps PySide6 out, before the cipher modules are imported
+import common  # noqa: F401
+import rsa
+
+def rate(power, blocks: list[int]) -> float:
+    start: float = perf_counter()
+    for block in blocks: power(block)
+    return len(blocks) / (perf_counter() - start)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="time private key exponentiation with and without crt")
+    parser.add_argument("-b", "--bits", type=int, nargs="+", default=[1024, 2048, 4096], help="modulus sizes in bits")
+    parser.add_argument("-n", "--blocks", type=int, default=50, help="blocks per size")
+    args = parser.parse_args()
+
+    print(f"{'bits':>6} {'(n, d) ops/s':>13} {'crt ops/s':>10} {'speedup':>8}")
+    for bit_length in args.bits:
+        random.seed(bit_length)
+        public_key, private_key = rsa.generate_keys(bit_length // 2)
+        n, d = private_key
+        blocks: list[int] = [random.randrange(n) for _ in range(args.blocks)]
+        for block in blocks[:4]:
+            if private_key.power(block) != pow(block, d, n): raise AssertionError(f"crt differs at {bit_length} bits")
+
+        plain_rate: float = rate(lambda block: pow(block, d, n), blocks)
+        crt_rate: float = rate(private_key.power, blocks)
+        print(f"{bit_length:>6} {plain_rate:>13.1f} {crt_rate:>10.1f} {crt_rate / plain_rate:>7.1f}x")
+
+if __name__ == "__main__": main()
@@ -0,0 +1,38 @@
+from time import perf_counter
+from statistics import mean
+import argparse
+import random
+import os
+
+# puts src on the path and keeps PySide6 out, before the cipher modules are imported
+import common  # noqa: F401
+import rsa
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="time rsa keygen against the worker count")
+    parser.add_argument("-b", "--bits", type=int, nargs="+", default=[1024, 2048], help="prime sizes in bits")
+    parser.add_argument("-n", "--trials", type=int, default=3, help="keys per size and worker count")
+    parser.add_argument("-p", "--processes", type=int, nargs="+", default=[1, 2, 4, os.cpu_count() or 1], help="worker counts to try")
+    args = parser.parse_args()
+
+    print(f"{'bits':>6} {'processes':>10} {'seconds':>9} {'speedup':>8}")
+    for bit_length in args.bits:
+        random.seed(bit_length)
+        times: list[float] = []
+        for _ in range(args.trials):
+            start: float = perf_counter()
+            rsa.generate_keys(bit_length)
+            times.append(perf_counter() - start)
+        sequential: float = mean(times)
+        print(f"{bit_length:>6} {'sequential':>10} {sequential:>9.2f} {'':>8}")
+
+        for processes in sorted(set(args.processes)):
+            times = []
+            for _ in range(args.trials):
+                start = perf_counter()
+                (n, e), (_, d) = rsa.generate_keys_parallel(bit_length, processes)
+                times.append(perf_counter() - start)
+                if pow(pow(42, e, n), d, n) != 42: raise AssertionError(f"bad {bit_length} bit key with {processes} processes")
+            print(f"{bit_length:>6} {processes:>10} {mean(times):>9.2f} {sequential / mean(times):>7.1f}x")
+
+if __name__ == "__main__": main()
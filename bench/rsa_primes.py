@@ -0,0 +1,48 @@
+from time import perf_counter
+from statistics import mean
+import argparse
+import random
+
+# puts src on the path and keeps PySide6 out, before the cipher modules are imported
+import common  # noqa: F401
+import rsa
+
+def reference_prime(bit_length: int) -> tuple[int, int]:
+    # the loop generate_large_prime ran before the sieve, a fresh random number every time and 50 rounds
+    draws: int = 0
+    while True:
+        draws += 1
+        candidate: int = random.getrandbits(bit_length)
+        if rsa.is_prime(candidate): return candidate, draws
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="time the sieved prime search against random draws")
+    parser.add_argument("-b", "--bits", type=int, nargs="+", default=[512, 1024, 2048], help="prime sizes in bits")
+    parser.add_argument("-n", "--trials", type=int, default=3, help="primes per size and method")
+    parser.add_argument("--no-reference", action="store_true", help="skip the random draw loop, it takes minutes at 4096 bits")
+    args = parser.parse_args()
+
+    print(f"{'bits':>6} {'method':>10} {'seconds':>9} {'candidates':>11} {'sieved':>8} {'tested':>8} {'rounds':>8} {'speedup':>8}")
+    for bit_length in args.bits:
+        random.seed(bit_length)
+        searches: list[rsa.PrimeSearch] = [rsa.find_prime(bit_length) for _ in range(args.trials)]
+        for search in searches:
+            if not rsa.is_prime(search.prime) or search.prime.bit_length() != bit_length: raise AssertionError(f"bad {bit_length} bit prime")
+        seconds: float = mean(search.seconds for search in searches)
+
+        speedup: str = ''
+        if not args.no_reference:
+            times: list[float] = []
+            draws: list[int] = []
+            for _ in range(args.trials):
+                start: float = perf_counter()
+                draws.append(reference_prime(bit_length)[1])
+                times.append(perf_counter() - start)
+            speedup = f"{mean(times) / seconds:.1f}x"
+            print(f"{bit_length:>6} {'draws':>10} {mean(times):>9.3f} {mean(draws):>11.0f} {'':>8} {'':>8} {'':>8} {'':>8}")
+
+        print(f"{bit_length:>6} {'sieve':>10} {seconds:>9.3f} {mean(search.candidates for search in searches):>11.0f} "
+              f"{mean(search.sieved for search in searches):>8.0f} {mean(search.tested for search in searches):>8.0f} "
+              f"{mean(search.rounds for search in searches):>8.0f} {speedup:>8}")
+
+if __name__ == "__main__": main()
@@ -0,0 +1,175 @@
+from typing import Any, Callable
+from statistics import median
+from time import perf_counter
+# common blocks the gui before any cipher module is imported, the suite only needs the cipher functions
+from common import corpus
+import argparse
+import platform
+import tempfile
+import random
+import json
+import sys
+import os
+
+from PIL import Image as pimg
+import steganography
+import playfair
+import affine
+import adfgvx
+import adfgx
+import rsa
+import dsa
+
+SEED: int = 0
+TEXT_SIZES: list[int] = [1_000, 10_000, 100_000]
+RSA_TEXT_SIZES: list[int] = [64, 512]
+RSA_BIT_LENGTHS: list[int] = [256, 512]
+FILE_SIZES: list[int] = [10_000, 1_000_000]
+IMAGE_SIZES: list[int] = [64, 256]
+# a few capitalised and punctuated words, so the formatters have something to strip
+WORDS: list[str] = (
+    "the quick brown fox jumps over lazy dog attack at dawn meet me near "
+    "old bridge 1984 2024 42 seven příliš žluťoučký kůň naïve café The Attack dawn. bridge, Příliš café! me?"
+).split(' ')
+
+Case = tuple[str, int, Callable[[], Any]]
+
+def binary_corpus(size: int, seed: int = SEED) -> bytes:
+    return random.Random(seed + size).randbytes(size)
+
+def classical_cases(sizes: list[int]) -> list[Case]:
+    cases: list[Case] = []
+    for size in sizes:
+        text: str = corpus(size, WORDS, SEED + size)
+
+        alphabet: str = affine.config["alphabet"]
+        affine_encrypted: str = affine.encrypt(text, 5, 8, alphabet) or ''
+        cases.append(("affine.encrypt", size, lambda text=text: affine.encrypt(text, 5, 8, alphabet)))
+        cases.append(("affine.decrypt", size, lambda text=affine_encrypted: affine.decrypt(text, 5, 8, alphabet)))
+
+        alphabet = playfair.config["alphabet"]
+        playfair_encrypted: str = playfair.encrypt(text, "monarchy", alphabet)
+        cases.append(("playfair.encrypt", size, lambda text=text, alphabet=alphabet: playfair.encrypt(text, "monarchy", alphabet)))
+        cases.append(("playfair.decrypt", size, lambda text=playfair_encrypted, alphabet=alphabet: playfair.decrypt(text, "monarchy", alphabet)))
+
+        alphabet = adfgx.config["alphabet"]
+        adfgx_encrypted: str = adfgx.encrypt(text, "keyword", "cargo", alphabet)
+        cases.append(("adfgx.encrypt", size, lambda text=text, alphabet=alphabet: adfgx.encrypt(text, "keyword", "cargo", alphabet)))
+        cases.append(("adfgx.decrypt", size, lambda text=adfgx_encrypted, alphabet=alphabet: adfgx.decrypt(text, "keyword", "cargo", alphabet)))
+
+        alphabet = adfgvx.config["alphabet"]
+        adfgvx_encrypted: str = adfgvx.encrypt(text, "na1c3h8tb2ome5wrpd4f6g7i9j0klqsuvxyz", "privacy", alphabet)
+        cases.append(("adfgvx.encrypt", size, lambda text=text, alphabet=alphabet: adfgvx.encrypt(text, "na1c3h8tb2ome5wrpd4f6g7i9j0klqsuvxyz", "privacy", alphabet)))
+        cases.append(("adfgvx.decrypt", size, lambda text=adfgvx_encrypted, alphabet=alphabet: adfgvx.decrypt(text, "na1c3h8tb2ome5wrpd4f6g7i9j0klqsuvxyz", "privacy", alphabet)))
+
+    return cases
+
+def rsa_keys(bit_length: int) -> tuple[tuple[int, int], tuple[int, int]]:
+    # rsa draws from the global random module
+    random.seed(SEED + bit_length)
+    return rsa.generate_keys(bit_length)
+
+def rsa_cases(bit_lengths: list[int], sizes: list[int]) -> list[Case]:
+    cases: list[Case] = []
+    for bit_length in bit_lengths:
+        cases.append(("rsa.generate_keys", bit_length, lambda bit_length=bit_length: rsa_keys(bit_length)))
+
+    public_key, private_key = rsa_keys(RSA_BIT_LENGTHS[-1])
+    for size in sizes:
+        text: str = corpus(size, WORDS, SEED + size).encode("ascii", "ignore").decode("ascii")
+        encrypted: list[int] = rsa.encrypt(text, public_key)
+        cases.append(("rsa.encrypt", size, lambda text=text: rsa.encrypt(text, public_key)))
+        cases.append(("rsa.decrypt", size, lambda encrypted=encrypted: rsa.decrypt(encrypted, private_key)))
+
+    return cases
+
+def dsa_cases(sizes: list[int], directory: str) -> list[Case]:
+    cases: list[Case] = []
+    public_key, private_key = rsa_keys(RSA_BIT_LENGTHS[-1])
+    for size in sizes:
+        file_path: str = os.path.join(directory, f"file_{size}.bin")
+        with open(file_path, "wb") as file: file.write(binary_corpus(size))
+
+        signature: str = dsa.sign_file(file_path, private_key)
+        cases.append(("dsa.hash_file", size, lambda file_path=file_path: dsa.hash_file(file_path)))
+        cases.append(("dsa.sign_file", size, lambda file_path=file_path: dsa.sign_file(file_path, private_key)))
+        cases.append(("dsa.verify_signature", size, lambda file_path=file_path, signature=signature: dsa.verify_signature(file_path, signature, public_key)))
+
+    return cases
+
+def steganography_cases(sizes: list[int], directory: str) -> list[Case]:
+    cases: list[Case] = []
+    for size in sizes:
+        image_path: str = os.path.join(directory, f"image_{size}.png")
+        output_path: str = os.path.join(directory, f"hidden_{size}.png")
+        pimg.frombytes("RGB", (size, size), binary_corpus(size * size * 3)).save(image_path)
+
+        # fill about half of the image capacity
+        message: str = corpus(size * size * 3 // 16, WORDS, SEED + size)
+        steganography.hide_message(image_path, message, output_path)
+        cases.append(("steganography.hide_message", size, lambda image_path=image_path, message=message, output_path=output_path: steganography.hide_message(image_path, message, output_path)))
+        cases.append(("steganography.extract_message", size, lambda output_path=output_path: steganography.extract_message(output_path)))
+
+    return cases
+
+def measure(function: Callable[[], Any], repeat: int) -> float:
+    # the median holds up better than the fastest run when the machine is busy
+    times: list[float] = []
+    for _ in range(repeat):
+        start: float = perf_counter()
+        function()
+        times.append(perf_counter() - start)
+    return median(times)
+
+def compare(results: dict[str, dict[str, Any]], baseline: dict[str, dict[str, Any]], tolerance: float) -> list[str]:
+    regressions: list[str] = []
+    for name, result in results.items():
+        if name not in baseline: continue
+        ratio: float = result["seconds"] / baseline[name]["seconds"]
+        result["baseline_ratio"] = ratio
+        if ratio > 1 + tolerance: regressions.append(f"{name}: {ratio:.2f}x slower than baseline")
+    return regressions
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="benchmark every cipher entry point")
+    parser.add_argument("-o", "--output", default="bench_results.json", help="json file to write results to")
+    parser.add_argument("-b", "--baseline", help="json results to compare against")
+    parser.add_argument("-t", "--tolerance", type=float, default=1.0, help="allowed slowdown against the baseline, 1.0 flags cases twice as slow")
+    parser.add_argument("-r", "--repeat", type=int, default=7, help="runs per case, the median counts")
+    parser.add_argument("--strict", action="store_true", help="exit 1 on regressions, only useful against a baseline from the same machine")
+    parser.add_argument("-k", "--filter", default="", help="only run cases whose name contains this")
+    parser.add_argument("--sizes", type=int, nargs="+", default=TEXT_SIZES, help="text corpus sizes in chars")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        cases: list[Case] = [
+            *classical_cases(args.sizes),
+            *rsa_cases(RSA_BIT_LENGTHS, RSA_TEXT_SIZES),
+            *dsa_cases(FILE_SIZES, directory),
+            *steganography_cases(IMAGE_SIZES, directory),
+        ]
+
+        results: dict[str, dict[str, Any]] = {}
+        for name, size, function in cases:
+            if args.filter not in name: continue
+            seconds: float = measure(function, args.repeat)
+            results[f"{name}[{size}]"] = {"case": name, "size": size, "seconds": seconds}
+            print(f"{name:<32} {size:>10} {seconds * 1000:>12.3f} ms")
+
+    regressions: list[str] = []
+    if args.baseline is not None:
+        with open(args.baseline, "r") as baseline_file:
+            regressions = compare(results, json.load(baseline_file)["results"], args.tolerance)
+
+    with open(args.output, "w") as output_file:
+        json.dump({
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": SEED,
+            "results": results,
+        }, output_file, indent=2)
+
+    for regression in regressions: print(f"regression: {regression}")
+    if len(regressions) > 0 and args.strict: sys.exit(1)
+
+if __name__ == "__main__": main()
@@ -1,17 +1,27 @@
-from typing import Any
+from typing import Any, BinaryIO, Iterable, Iterator
+from functools import lru_cache
 import text_formatter as tf
-import PySide6.QtWidgets as qtw
-import PySide6.QtCore as qtc
+import columnar
+try:
+    import PySide6.QtWidgets as qtw
+    import PySide6.QtCore as qtc
+except ImportError:
+    qtw = qtc = None
 import random
 import string
 import sys
+import os
 
 config: dict[str, Any] = {
     "alphabet": string.ascii_lowercase + string.digits
 }
 
+# formatted chars per block of the blocked mode, every full block encrypts to twice as many coordinates
+BLOCK_SIZE: int = 1 << 16
+
 def main() -> None:
     if len(sys.argv) == 1:
+        if qtw is None: sys.exit("PySide6 is required for the gui")
         app = qtw.QApplication(sys.argv)
 
         stylesheet_path = "../stylesheet"
@@ -39,8 +49,7 @@ def main() -> None:
 def format_text(input_text: str) -> str:
     if len(input_text) <= 0: return input_text
 
-    char_map: dict[str, str] = tf.get_char_map()
-    formatted_text: str = tf.normalize_text(input_text, char_map=char_map)
+    formatted_text: str = tf.get_codec("char_map").normalize(input_text)
 
     return formatted_text
 
@@ -58,13 +67,7 @@ def create_key_matrix(key: str, alphabet: str) -> list[list[str]]:
 
 def create_columnar_key(key: str) -> list[int]:
     if len(key) <= 0: return []
-
-    key = format_text(key)
-    positions: list[int] = list(range(len(key)))
-    pairs: list[tuple[str, int]] = sorted(zip(key, positions))
-    sorted_positions: list[int] = list(zip(*pairs))[1]
-
-    return sorted_positions
+    return list(columnar.columnar_order(format_text(key)))
 
 def random_alphabet(length: int) -> str:
     alphabet: str = string.ascii_lowercase + string.digits
@@ -78,79 +81,147 @@ def get_coordinates(key_matrix: list[list[str]], char: str) -> tuple[str, str]:
             return (coordinates[i], coordinates[row.index(char)])
     return ('', '')
 
-def encrypt(input_text: str, key1: str, key2: str, alphabet: str) -> str:
-    if len(input_text) <= 0: return input_text
-    key1 = key1.replace(' ', '')
-    key2 = key2.replace(' ', '')
-
-    matrix: list[list[str]] = create_key_matrix(key1, alphabet)
-    formatted_text: str = format_text(input_text)
+class ADFGVXKey(columnar.FractionatingKey):
+    __slots__ = ("key1", "key2", "alphabet")
 
-    coordinates: str = '' 
-    for char in formatted_text:
-        coords: tuple[str, str] = get_coordinates(matrix, char)
-        coordinates += coords[0] + coords[1]
+    def __init__(self, key1: str, key2: str, alphabet: str) -> None:
+        self.key1: str = key1.replace(' ', '')
+        self.key2: str = key2.replace(' ', '')
+        self.alphabet: str = alphabet
+        super().__init__(create_key_matrix(self.key1, alphabet), "ADFGVX", create_columnar_key(self.key2))
 
-    key_order: list[int] = create_columnar_key(key2)
-    key_length: int = len(key2)
+    def format(self, input_text: str) -> str:
+        return self.strip(format_text(input_text))
 
-    columns: list[str] = [coordinates[i::key_length] for i in range(key_length)]
-    encrypted_text = ''.join(columns[i] for i in key_order)
+@lru_cache(maxsize=128)
+def compile_key(key1: str, key2: str, alphabet: str) -> ADFGVXKey:
+    return ADFGVXKey(key1, key2, alphabet)
 
-    # uncomment for presentation, delete afterwards
-    # separated: list[str] = []
-    # cc = 0
-    # for i, c in enumerate(encrypted_text):
-    #     current_col_length = len(columns[cc])
-    #     if i == 0 or i % current_col_length != 0:
-    #         separated.append(c)
-    #     else: 
-    #         separated.append(f' {c}')
-    #         if cc < len(columns) - 1: cc += 1
-    # encrypted_text = ''.join(separated)
+def _encrypt_message(key: ADFGVXKey, input_text: str) -> str:
+    if len(input_text) <= 0: return input_text
 
-    return encrypted_text
+    formatted_text: str = format_text(input_text)
+    return key.encrypt(formatted_text)
 
-def decrypt(input_text: str, key1: str, key2: str, alphabet: str) -> str:
+def _decrypt_message(key: ADFGVXKey, input_text: str) -> str:
     if len(input_text) <= 0: return input_text
     input_text = input_text.replace(' ', '')
-    key1 = key1.replace(' ', '')
-    key2 = key2.replace(' ', '')
-
-    matrix: list[list[str]] = create_key_matrix(key1, alphabet)
-    key_order: list[int] = create_columnar_key(key2)
-    key_length: int = len(key2)
-
-    col_lengths: list[int] = [
-            len(input_text) // key_length if key_length > 0 else 0
-    ] * key_length
-    remainder: int = len(input_text) % key_length if key_length > 0 else 0
-    for i in range(remainder): col_lengths[i] += 1
-
-    columns: list[str] = [''] * key_length
-    pos: int = 0
-    for i in key_order:
-        columns[i] = input_text[pos:pos+col_lengths[i]]
-        pos += col_lengths[i]
-
-    coordinates: str = ''
-    for i in range(max(col_lengths)):
-        for col in columns:
-            if i >= len(col): continue
-            coordinates += col[i]
-
-    decrypted_text: str = ''
-    for i in range(0, len(coordinates), 2):
-        row_idx: int = "ADFGVX".index(coordinates[i])
-        col_idx: int = "ADFGVX".index(coordinates[i + 1])
-        decrypted_text += matrix[row_idx][col_idx]
-
-    char_map: dict[str, str] = tf.get_char_map()
-    decrypted_text = tf.replace_char_map_values(decrypted_text, char_map)
-
-    return decrypted_text
-
-class App(qtw.QMainWindow):
+
+    decrypted_text: str = key.decrypt(input_text)
+    return tf.get_codec("char_map").decode(decrypted_text)
+
+def encrypt(input_text: str, key1: str, key2: str, alphabet: str) -> str:
+    return _encrypt_message(compile_key(key1, key2, alphabet), input_text)
+
+def decrypt(input_text: str, key1: str, key2: str, alphabet: str) -> str:
+    return _decrypt_message(compile_key(key1, key2, alphabet), input_text)
+
+# many messages under one key, workers compile it once and get the messages in batches
+
+def encrypt_many(messages: Iterable[str], key1: str, key2: str, alphabet: str,
+                 processes: int | None = 1, batch_size: int = columnar.MESSAGE_BATCH) -> Iterator[str]:
+    # one result per message in order, processes None uses every core
+    return columnar.map_messages(_encrypt_message, messages, compile_key, (key1, key2, alphabet), processes, batch_size)
+
+def decrypt_many(messages: Iterable[str], key1: str, key2: str, alphabet: str,
+                 processes: int | None = 1, batch_size: int = columnar.MESSAGE_BATCH) -> Iterator[str]:
+    return columnar.map_messages(_decrypt_message, messages, compile_key, (key1, key2, alphabet), processes, batch_size)
+
+# blocked mode, "<block size>\n", the full blocks, then "\n<final block length>\n" and the final block
+
+def _split_blocks(chunks: Iterable[str], block_size: int) -> Iterator[str]:
+    # full blocks and then the rest, which is shorter than a block and may be empty
+    carry: str = ''
+    for chunk in chunks:
+        buffer: str = carry + chunk
+        end: int = len(buffer) - len(buffer) % block_size
+        for i in range(0, end, block_size): yield buffer[i:i+block_size]
+        carry = buffer[end:]
+    yield carry
+
+def _read_blocks(chunks: Iterable[str]) -> Iterator[str]:
+    buffer: str = ''
+    block_length: int | None = None
+    final_length: int | None = None
+    for chunk in chunks:
+        buffer += chunk
+        while True:
+            if block_length is None or (final_length is None and buffer.startswith('\n')):
+                # the header and the final block header are one number ending with a newline
+                start: int = 0 if block_length is None else 1
+                end: int = buffer.find('\n', start)
+                if end < 0: break
+                length: int = int(buffer[start:end]) * 2
+                if block_length is None:
+                    if length <= 0: raise ValueError("adfgvx block size has to be positive")
+                    block_length = length
+                else: final_length = length
+                buffer = buffer[end+1:]
+            elif final_length is None and len(buffer) >= block_length:
+                yield buffer[:block_length]
+                buffer = buffer[block_length:]
+            else: break
+
+    if final_length is None: raise ValueError("adfgvx blocked ciphertext ends before its final block")
+    if len(buffer) != final_length: raise ValueError("adfgvx final block length does not match its header")
+    yield buffer
+
+def encrypt_blocks(chunks: Iterable[str], key1: str, key2: str, alphabet: str,
+                   block_size: int = BLOCK_SIZE, processes: int | None = None) -> Iterator[str]:
+    if block_size <= 0: raise ValueError("adfgvx block size has to be positive")
+    if processes is None: processes = os.cpu_count() or 1
+    key: ADFGVXKey = compile_key(key1, key2, alphabet)
+
+    yield f"{block_size}\n"
+    with columnar.worker_executor(compile_key, (key1, key2, alphabet), processes) as executor:
+        # the normalizer carries its whitespace state across chunks, chars outside the matrix go before blocking,
+        # so every full block has the same length
+        formatted_chunks: Iterator[str] = map(key.strip, tf.get_codec("char_map").normalizer.stream(chunks))
+        blocks: Iterator[str] = _split_blocks(formatted_chunks, block_size)
+        for encrypted_block in columnar.map_with_key(ADFGVXKey.encrypt, key, blocks, executor, processes):
+            # only the final block is shorter than a full one
+            if len(encrypted_block) < block_size * 2: yield f"\n{len(encrypted_block) // 2}\n"
+            yield encrypted_block
+
+def decrypt_blocks(chunks: Iterable[str], key1: str, key2: str, alphabet: str,
+                   processes: int | None = None) -> Iterator[str]:
+    if processes is None: processes = os.cpu_count() or 1
+    key: ADFGVXKey = compile_key(key1, key2, alphabet)
+    with columnar.worker_executor(compile_key, (key1, key2, alphabet), processes) as executor:
+        decrypted_blocks: Iterator[str] = columnar.map_with_key(ADFGVXKey.decrypt, key, _read_blocks(chunks),
+                                                                  executor, processes)
+        yield from tf.get_codec("char_map").decode_chunks(decrypted_blocks)
+
+def encrypt_blocked(input_text: str, key1: str, key2: str, alphabet: str,
+                    block_size: int = BLOCK_SIZE, processes: int | None = None) -> str:
+    # empty text still gets its header, like an empty file
+    return ''.join(encrypt_blocks([input_text], key1, key2, alphabet, block_size, processes))
+
+def decrypt_blocked(input_text: str, key1: str, key2: str, alphabet: str, processes: int | None = None) -> str:
+    return ''.join(decrypt_blocks([input_text], key1, key2, alphabet, processes))
+
+def encrypt_file(source: str | os.PathLike | BinaryIO, target: str | os.PathLike | BinaryIO,
+                 key1: str, key2: str, alphabet: str, block_size: int = BLOCK_SIZE,
+                 processes: int | None = None, chunk_size: int = tf.CHUNK_SIZE) -> int:
+    return tf.transform_file(source, target, lambda chunks: encrypt_blocks(chunks, key1, key2, alphabet, block_size, processes), chunk_size)
+
+def decrypt_file(source: str | os.PathLike | BinaryIO, target: str | os.PathLike | BinaryIO,
+                 key1: str, key2: str, alphabet: str, processes: int | None = None,
+                 chunk_size: int = tf.CHUNK_SIZE) -> int:
+    return tf.transform_file(source, target, lambda chunks: decrypt_blocks(chunks, key1, key2, alphabet, processes), chunk_size)
+
+# cryptanalysis
+
+def solve(input_text: str, alphabet: str, key_lengths: Iterable[int] = range(2, 11), processes: int | None = None,
+          restarts: int = 8, seed: int | None = None) -> columnar.SolverResult:
+    cells: str = ''.join(map(''.join, create_key_matrix('', alphabet)))
+    result: columnar.SolverResult = columnar.solve(input_text, "ADFGVX", cells, key_lengths, processes, restarts, seed,
+                                                   padding=tf.get_codec("char_map").char_map[' '])
+    # decrypt with the recovered keys, so they are known to plug straight back in
+    return result._replace(plaintext=decrypt(input_text, result.key1, result.key2, alphabet))
+
+# the gui is optional, the cipher functions also work headless
+class App(qtw.QMainWindow if qtw is not None else object):
     def __init__(self) -> None:
         super().__init__()
         self.setWindowTitle("adfgvx")
@@ -277,7 +348,7 @@ class App(qtw.QMainWindow):
         self.key1_text.setText(random_alphabet(self.matrix_size * self.matrix_size))
         self.update_key_matrix()
 
-    def clear_layout(self, layout: qtw.QLayout | None): 
+    def clear_layout(self, layout: 'qtw.QLayout | None'): 
         if layout is None: return
         while layout.count():
             item = layout.takeAt(0)
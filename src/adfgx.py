@@ -1,7 +1,12 @@
-from typing import Any
+from typing import Any, Iterable, Iterator
+from functools import lru_cache
 import text_formatter as tf
-import PySide6.QtWidgets as qtw
-import PySide6.QtCore as qtc
+import columnar
+try:
+    import PySide6.QtWidgets as qtw
+    import PySide6.QtCore as qtc
+except ImportError:
+    qtw = qtc = None
 import random
 import string
 import sys
@@ -12,6 +17,7 @@ config: dict[str, Any] = {
 
 def main() -> None:
     if len(sys.argv) == 1:
+        if qtw is None: sys.exit("PySide6 is required for the gui")
         app = qtw.QApplication(sys.argv)
 
         stylesheet_path = "../stylesheet"
@@ -39,17 +45,14 @@ def main() -> None:
 def format_text(input_text: str) -> str:
     if len(input_text) <= 0: return input_text
 
-    char_map: dict[str, str] = tf.get_char_map()
-    formatted_text: str = tf.normalize_text(input_text, char_map=char_map)
+    formatted_text: str = tf.get_codec("char_map").normalize(input_text)
     formatted_text = formatted_text.replace('j', 'i')
 
     return formatted_text
 
 def create_key_matrix(key: str, alphabet: str) -> list[list[str]]:
     if len(key) > 0:
-        char_map = tf.get_char_map()
-        for c in char_map: char_map[c] = ''
-        key = tf.normalize_text(key, char_map = char_map)
+        key = tf.get_codec("deleting_char_map").normalize(key)
         key = key.replace('j', 'i')
 
     key_matrix = sorted(set(key), key=lambda x: key.index(x))
@@ -59,13 +62,7 @@ def create_key_matrix(key: str, alphabet: str) -> list[list[str]]:
 
 def create_columnar_key(key: str) -> list[int]:
     if len(key) <= 0: return []
-
-    key = format_text(key)
-    positions: list[int] = list(range(len(key)))
-    pairs: list[tuple[str, int]] = sorted(zip(key, positions))
-    sorted_positions: list[int] = list(zip(*pairs))[1]
-
-    return sorted_positions
+    return list(columnar.columnar_order(format_text(key)))
 
 def random_alphabet(length: int) -> str:
     alphabet: str = string.ascii_lowercase.replace('j', '')
@@ -78,79 +75,61 @@ def get_coordinates(key_matrix: list[list[str]], char: str) -> tuple[str, str]:
         if char in row: return (coordinates[i], coordinates[row.index(char)])
     return ('', '')
 
-def encrypt(input_text: str, key1: str, key2: str, alphabet: str) -> str:
+class ADFGXKey(columnar.FractionatingKey):
+    __slots__ = ("key1", "key2", "alphabet")
+
+    def __init__(self, key1: str, key2: str, alphabet: str) -> None:
+        self.key1: str = key1.replace(' ', '')
+        self.key2: str = key2.replace(' ', '')
+        self.alphabet: str = alphabet
+        super().__init__(create_key_matrix(self.key1, alphabet), "ADFGX", create_columnar_key(self.key2))
+
+@lru_cache(maxsize=128)
+def compile_key(key1: str, key2: str, alphabet: str) -> ADFGXKey:
+    return ADFGXKey(key1, key2, alphabet)
+
+def _encrypt_message(key: ADFGXKey, input_text: str) -> str:
     if len(input_text) <= 0: return input_text
-    key1 = key1.replace(' ', '')
-    key2 = key2.replace(' ', '')
 
-    matrix: list[list[str]] = create_key_matrix(key1, alphabet)
     formatted_text: str = format_text(input_text)
+    return key.encrypt(formatted_text)
 
-    coordinates: str = '' 
-    for char in formatted_text:
-        coords: tuple[str, str] = get_coordinates(matrix, char)
-        coordinates += coords[0] + coords[1]
+def _decrypt_message(key: ADFGXKey, input_text: str) -> str:
+    if len(input_text) <= 0: return input_text
+    input_text = input_text.replace(' ', '')
 
-    key_order: list[int] = create_columnar_key(key2)
-    key_length: int = len(key2)
+    decrypted_text: str = key.decrypt(input_text)
+    return tf.get_codec("char_map").decode(decrypted_text)
 
-    columns: list[str] = [coordinates[i::key_length] for i in range(key_length)]
-    encrypted_text = ''.join(columns[i] for i in key_order)
+def encrypt(input_text: str, key1: str, key2: str, alphabet: str) -> str:
+    return _encrypt_message(compile_key(key1, key2, alphabet), input_text)
 
-    # uncomment for presentation, delete afterwards
-    # separated: list[str] = []
-    # cc = 0
-    # for i, c in enumerate(encrypted_text):
-    #     current_col_length = len(columns[cc])
-    #     if i == 0 or i % current_col_length != 0:
-    #         separated.append(c)
-    #     else: 
-    #         separated.append(f' {c}')
-    #         if cc < len(columns) - 1: cc += 1
-    # encrypted_text = ''.join(separated)
+def decrypt(input_text: str, key1: str, key2: str, alphabet: str) -> str:
+    return _decrypt_message(compile_key(key1, key2, alphabet), input_text)
 
-    return encrypted_text
+# many messages under one key, workers compile it once and get the messages in batches
 
-def decrypt(input_text: str, key1: str, key2: str, alphabet: str) -> str:
-    if len(input_text) <= 0: return input_text
-    input_text = input_text.replace(' ', '')
-    key1 = key1.replace(' ', '')
-    key2 = key2.replace(' ', '')
-
-    matrix: list[list[str]] = create_key_matrix(key1, alphabet)
-    key_order: list[int] = create_columnar_key(key2)
-    key_length: int = len(key2)
-
-    col_lengths: list[int] = [
-            len(input_text) // key_length if key_length > 0 else 0
-    ] * key_length
-    remainder: int = len(input_text) % key_length if key_length > 0 else 0
-    for i in range(remainder): col_lengths[i] += 1
-
-    columns: list[str] = [''] * key_length
-    pos: int = 0
-    for i in key_order:
-        columns[i] = input_text[pos:pos+col_lengths[i]]
-        pos += col_lengths[i]
-
-    coordinates: str = ''
-    for i in range(max(col_lengths)):
-        for col in columns:
-            if i >= len(col): continue
-            coordinates += col[i]
-
-    decrypted_text: str = ''
-    for i in range(0, len(coordinates), 2):
-        row_idx: int = "ADFGX".index(coordinates[i])
-        col_idx: int = "ADFGX".index(coordinates[i + 1])
-        decrypted_text += matrix[row_idx][col_idx]
-
-    char_map: dict[str, str] = tf.get_char_map()
-    decrypted_text = tf.replace_char_map_values(decrypted_text, char_map)
-
-    return decrypted_text
-
-class App(qtw.QMainWindow):
+def encrypt_many(messages: Iterable[str], key1: str, key2: str, alphabet: str,
+                 processes: int | None = 1, batch_size: int = columnar.MESSAGE_BATCH) -> Iterator[str]:
+    # one result per message in order, processes None uses every core
+    return columnar.map_messages(_encrypt_message, messages, compile_key, (key1, key2, alphabet), processes, batch_size)
+
+def decrypt_many(messages: Iterable[str], key1: str, key2: str, alphabet: str,
+                 processes: int | None = 1, batch_size: int = columnar.MESSAGE_BATCH) -> Iterator[str]:
+    return columnar.map_messages(_decrypt_message, messages, compile_key, (key1, key2, alphabet), processes, batch_size)
+
+# cryptanalysis
+
+def solve(input_text: str, alphabet: str, key_lengths: Iterable[int] = range(2, 11), processes: int | None = None,
+          restarts: int = 8, seed: int | None = None) -> columnar.SolverResult:
+    cells: str = ''.join(map(''.join, create_key_matrix('', alphabet)))
+    result: columnar.SolverResult = columnar.solve(input_text, "ADFGX", cells, key_lengths, processes, restarts, seed,
+                                                   padding=tf.get_codec("char_map").char_map[' '])
+    # decrypt with the recovered keys, so they are known to plug straight back in
+    return result._replace(plaintext=decrypt(input_text, result.key1, result.key2, alphabet))
+
+# the gui is optional, the cipher functions also work headless
+class App(qtw.QMainWindow if qtw is not None else object):
     def __init__(self) -> None:
         super().__init__()
         self.setWindowTitle("adfgx")
@@ -284,7 +263,7 @@ class App(qtw.QMainWindow):
         self.key1_text.setText(random_alphabet(self.matrix_size * self.matrix_size))
         self.update_key_matrix()
 
-    def clear_layout(self, layout: qtw.QLayout | None): 
+    def clear_layout(self, layout: 'qtw.QLayout | None'): 
         if layout is None: return
         while layout.count():
             item = layout.takeAt(0)
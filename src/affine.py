@@ -1,16 +1,31 @@
 from string import ascii_lowercase
-from typing import Any
+from functools import lru_cache
+from typing import Any, Sequence
 from math import gcd
-import PySide6.QtWidgets as qtw
+try: import PySide6.QtWidgets as qtw
+except ImportError: qtw = None
+import numpy as np
 import text_formatter as tf
 import sys
 
 config: dict[str, Any] = {
     "alphabet": ascii_lowercase,
+    "batch_cells": 1 << 24,
 }
 
+ENGLISH_FREQUENCIES: dict[str, float] = {
+    'a': 0.08167, 'b': 0.01492, 'c': 0.02782, 'd': 0.04253, 'e': 0.12702, 'f': 0.02228,
+    'g': 0.02015, 'h': 0.06094, 'i': 0.06966, 'j': 0.00153, 'k': 0.00772, 'l': 0.04025,
+    'm': 0.02406, 'n': 0.06749, 'o': 0.07507, 'p': 0.01929, 'q': 0.00095, 'r': 0.05987,
+    's': 0.06327, 't': 0.09056, 'u': 0.02758, 'v': 0.00978, 'w': 0.02360, 'x': 0.00150,
+    'y': 0.01974, 'z': 0.00074,
+}
+SPACE_FREQUENCY: float = 0.18
+MIN_FREQUENCY: float = 1e-4
+
 def main() -> None:
     if len(sys.argv) == 1:
+        if qtw is None: sys.exit("PySide6 is required for the gui")
         app = qtw.QApplication(sys.argv)
 
         stylesheet_path = "../stylesheet"
@@ -35,27 +50,58 @@ def main() -> None:
         case _: print("unknown argument")
 
 def modular_inverse(a: int, m: int) -> int | None:
-    if m == 0: return None
+    if m <= 1: return None
     if gcd(a, m) != 1: return None
+    return pow(a, -1, m)
 
-    a = a % m
-    for x in range(1, m):
-        if (a * x) % m == 1: return x
-
-    return None
+@lru_cache(maxsize=32)
+def alphabet_index(alphabet: str) -> dict[str, int]:
+    # alphabet.index maps a repeated char to its first position
+    indices: dict[str, int] = {}
+    for i, char in enumerate(alphabet): indices.setdefault(char, i)
+    return indices
 
 def format_encryption_input(input_text: str) -> str:
     if len(input_text) <= 0: return input_text
-    char_map: dict[str, str] = tf.get_char_map()
-    formatted_text: str = tf.normalize_text(input_text, char_map=char_map)
+    formatted_text: str = tf.get_codec("char_map").normalize(input_text)
     return formatted_text
 
 def format_decryption_input(input_text: str) -> str:
     if len(input_text) <= 0: return input_text
-    char_map: dict[str, str] = tf.get_deleting_char_map()
-    formatted_text: str = tf.normalize_text(input_text, char_map=char_map)
+    formatted_text: str = tf.get_codec("deleting_char_map").normalize(input_text)
     return formatted_text
 
+class AffineKey:
+    __slots__ = ("a", "b", "alphabet", "a_inv", "_encrypt_table", "_decrypt_table")
+
+    def __init__(self, a: int, b: int, alphabet: str) -> None:
+        m: int = len(alphabet)
+        a_inv: int | None = modular_inverse(a, m)
+        if a_inv is None: raise ValueError(f"{a} has no inverse modulo {m}")
+
+        self.a: int = a
+        self.b: int = b
+        self.alphabet: str = alphabet
+        self.a_inv: int = a_inv
+
+        indices: dict[str, int] = alphabet_index(alphabet)
+        self._encrypt_table: dict[int, int] = {
+            ord(char): ord(alphabet[(a * x + b) % m]) for char, x in indices.items()
+        }
+        self._decrypt_table: dict[int, int] = {
+            ord(char): ord(alphabet[(a_inv * (x - b)) % m]) for char, x in indices.items()
+        }
+
+    def encrypt(self, formatted_text: str) -> str:
+        return formatted_text.translate(self._encrypt_table)
+
+    def decrypt(self, formatted_text: str) -> str:
+        return formatted_text.translate(self._decrypt_table)
+
+@lru_cache(maxsize=128)
+def compile_key(a: int, b: int, alphabet: str) -> AffineKey:
+    return AffineKey(a, b, alphabet)
+
 def encrypt(input_text: str, a: int, b: int, alphabet: str) -> str | None:
     if len(input_text) <= 0: return input_text
 
@@ -65,15 +111,7 @@ def encrypt(input_text: str, a: int, b: int, alphabet: str) -> str | None:
     if modular_inverse(a, m) is None: return ''
 
     formatted_text: str = format_encryption_input(input_text)
-    encrypted_text: list[str] = []
-    for char in formatted_text:
-        if char in alphabet:
-            x: int = alphabet.index(char)
-            encrypted_text.append(alphabet[(a * x + b) % m])
-        else:
-            encrypted_text.append(char)
-
-    return ''.join(encrypted_text)
+    return compile_key(a, b, alphabet).encrypt(formatted_text)
 
 def decrypt(input_text: str, a: int, b: int, alphabet: str) -> str | None:
     if len(input_text) <= 0: return input_text
@@ -81,22 +119,160 @@ def decrypt(input_text: str, a: int, b: int, alphabet: str) -> str | None:
     m: int = len(alphabet)
     if m == 0: return None
 
-    a_inv: int | None = modular_inverse(a, m)
-    if a_inv is None: return ''
+    if modular_inverse(a, m) is None: return ''
 
     formatted_text: str = format_decryption_input(input_text)
-    decrypted_text: list[str] = []
-    for char in formatted_text:
-        if char in alphabet:
-            x: int = alphabet.index(char)
-            decrypted_text.append(alphabet[(a_inv * (x - b)) % m])
-        else:
-            decrypted_text.append(char)
-
-    char_map: dict[str, str] = tf.get_char_map()
-    return tf.replace_char_map_values(''.join(decrypted_text), char_map=char_map)
-
-class App(qtw.QMainWindow):
+    decrypted_text: str = compile_key(a, b, alphabet).decrypt(formatted_text)
+    return tf.get_codec("char_map").decode(decrypted_text)
+
+def text_to_code_points(input_text: str) -> np.ndarray:
+    return np.frombuffer(input_text.encode("utf-32-le", "surrogatepass"), dtype=np.uint32)
+
+def code_points_to_text(code_points: np.ndarray) -> str:
+    return code_points.astype(np.uint32).tobytes().decode("utf-32-le", "surrogatepass")
+
+@lru_cache(maxsize=32)
+def alphabet_arrays(alphabet: str) -> tuple[np.ndarray, np.ndarray]:
+    code_points: np.ndarray = text_to_code_points(alphabet)
+    indices: dict[str, int] = alphabet_index(alphabet)
+    positions: np.ndarray = np.full(int(code_points.max()) + 1, -1, dtype=np.int64)
+    positions[text_to_code_points(''.join(indices))] = list(indices.values())
+    return code_points, positions
+
+def transform_codes(code_points: np.ndarray, a: Any, b: Any, alphabet: str, inverse: bool = False) -> np.ndarray:
+    # a and b broadcast against code_points, (k, 1) keys over (n,) chars give a (k, n) batch
+    alphabet_code_points, positions = alphabet_arrays(alphabet)
+    m: int = len(alphabet)
+
+    x: np.ndarray = positions[np.minimum(code_points, len(positions) - 1)]
+    x = np.where(code_points < len(positions), x, -1)
+    a = np.asarray(a, dtype=np.int64) % m
+    b = np.asarray(b, dtype=np.int64) % m
+
+    y: np.ndarray = (a * (x - b)) % m if inverse else (a * x + b) % m
+    return np.where(x >= 0, alphabet_code_points[y], code_points)
+
+def _transform_many(formatted_texts: list[str], a: int, b: int, alphabet: str, inverse: bool) -> list[str]:
+    code_points: np.ndarray = text_to_code_points(''.join(formatted_texts))
+    transformed_text: str = code_points_to_text(transform_codes(code_points, a, b, alphabet, inverse))
+
+    result: list[str] = []
+    start: int = 0
+    for formatted_text in formatted_texts:
+        result.append(transformed_text[start:start+len(formatted_text)])
+        start += len(formatted_text)
+
+    return result
+
+def _transform_keys(formatted_text: str, keys: list[tuple[int, int]], alphabet: str, inverse: bool) -> list[str]:
+    code_points: np.ndarray = text_to_code_points(formatted_text)
+    rows: int = max(1, config["batch_cells"] // max(1, len(code_points)))
+
+    result: list[str] = []
+    for i in range(0, len(keys), rows):
+        block: np.ndarray = np.array(keys[i:i+rows], dtype=np.int64)
+        transformed: np.ndarray = transform_codes(code_points, block[:, :1], block[:, 1:], alphabet, inverse)
+        result += [code_points_to_text(row) for row in transformed]
+
+    return result
+
+def encrypt_many(input_texts: Sequence[str], a: int, b: int, alphabet: str) -> list[str | None]:
+    m: int = len(alphabet)
+    if m == 0: return [input_text if len(input_text) <= 0 else None for input_text in input_texts]
+    if modular_inverse(a, m) is None: return [input_text if len(input_text) <= 0 else '' for input_text in input_texts]
+
+    formatted_texts: list[str] = [format_encryption_input(input_text) for input_text in input_texts]
+    return [*_transform_many(formatted_texts, a, b, alphabet, False)]
+
+def decrypt_many(input_texts: Sequence[str], a: int, b: int, alphabet: str) -> list[str | None]:
+    m: int = len(alphabet)
+    if m == 0: return [input_text if len(input_text) <= 0 else None for input_text in input_texts]
+    a_inv: int | None = modular_inverse(a, m)
+    if a_inv is None: return [input_text if len(input_text) <= 0 else '' for input_text in input_texts]
+
+    formatted_texts: list[str] = [format_decryption_input(input_text) for input_text in input_texts]
+    codec: tf.CharMapCodec = tf.get_codec("char_map")
+    return [
+        codec.decode(decrypted_text) if len(input_text) > 0 else input_text
+        for input_text, decrypted_text in zip(input_texts, _transform_many(formatted_texts, a_inv, b, alphabet, True))
+    ]
+
+def encrypt_keys(input_text: str, keys: Sequence[tuple[int, int]], alphabet: str) -> list[str | None]:
+    if len(input_text) <= 0: return [input_text for _ in keys]
+    m: int = len(alphabet)
+    if m == 0: return [None for _ in keys]
+
+    valid_keys: list[tuple[int, int]] = [(a, b) for a, b in keys if modular_inverse(a, m) is not None]
+    encrypted_texts: list[str] = _transform_keys(format_encryption_input(input_text), valid_keys, alphabet, False)
+    encrypted: dict[tuple[int, int], str] = dict(zip(valid_keys, encrypted_texts))
+    return [encrypted.get((a, b), '') for a, b in keys]
+
+def decrypt_keys(input_text: str, keys: Sequence[tuple[int, int]], alphabet: str) -> list[str | None]:
+    if len(input_text) <= 0: return [input_text for _ in keys]
+    m: int = len(alphabet)
+    if m == 0: return [None for _ in keys]
+
+    inverse_keys: list[tuple[int, int]] = []
+    valid_keys: list[tuple[int, int]] = []
+    for a, b in keys:
+        a_inv: int | None = modular_inverse(a, m)
+        if a_inv is None: continue
+        inverse_keys.append((a_inv, b))
+        valid_keys.append((a, b))
+
+    codec: tf.CharMapCodec = tf.get_codec("char_map")
+    decrypted_texts: list[str] = _transform_keys(format_decryption_input(input_text), inverse_keys, alphabet, True)
+    decrypted: dict[tuple[int, int], str] = {key: codec.decode(text) for key, text in zip(valid_keys, decrypted_texts)}
+    return [decrypted.get((a, b), '') for a, b in keys]
+
+def valid_keys(alphabet: str) -> list[tuple[int, int]]:
+    m: int = len(alphabet)
+    return [(a, b) for a in range(1, m) if gcd(a, m) == 1 for b in range(m)]
+
+def expected_frequencies(alphabet: str, frequencies: dict[str, float] | None = None) -> np.ndarray:
+    if frequencies is None: frequencies = ENGLISH_FREQUENCIES
+
+    # formatted plaintext spells every space out with the space code
+    weights: dict[str, float] = {c: f * (1 - SPACE_FREQUENCY) for c, f in frequencies.items()}
+    for c in tf.get_codec("char_map").char_map[' ']:
+        weights[c] = weights.get(c, 0.0) + SPACE_FREQUENCY
+    total: float = sum(weights.values())
+
+    return np.array([max(weights.get(c, 0.0) / total, MIN_FREQUENCY) for c in alphabet])
+
+def crack(input_text: str, alphabet: str, top: int = 5, frequencies: dict[str, float] | None = None) -> list[tuple[int, int, float]]:
+    # chi-squared of every (a, b) against the expected char frequencies, lowest score first
+    m: int = len(alphabet)
+    if m <= 1: return []
+
+    _, positions = alphabet_arrays(alphabet)
+    code_points: np.ndarray = text_to_code_points(format_decryption_input(input_text))
+    code_points = code_points[code_points < len(positions)]
+    x: np.ndarray = positions[code_points]
+    counts: np.ndarray = np.bincount(x[x >= 0], minlength=m).astype(np.float64)
+    total: float = counts.sum()
+    if total <= 0: return []
+
+    expected: np.ndarray = total * expected_frequencies(alphabet, frequencies)
+    a_values: np.ndarray = np.array([a for a in range(1, m) if gcd(a, m) == 1], dtype=np.int64)
+    a_inverses: np.ndarray = np.array([modular_inverse(int(a), m) for a in a_values], dtype=np.int64)
+    b_values: np.ndarray = np.arange(m, dtype=np.int64)
+    y: np.ndarray = np.arange(m, dtype=np.int64)
+
+    # plaintext position of every ciphertext position, for every (a, b): shape (a, b, y)
+    rows: int = max(1, config["batch_cells"] // (m * m))
+    scores: list[np.ndarray] = []
+    for i in range(0, len(a_values), rows):
+        plain: np.ndarray = (a_inverses[i:i+rows, None, None] * (y[None, None, :] - b_values[None, :, None])) % m
+        block_expected: np.ndarray = expected[plain]
+        scores.append((((counts - block_expected) ** 2) / block_expected).sum(axis=2).ravel())
+
+    all_scores: np.ndarray = np.concatenate(scores)
+    best: np.ndarray = np.argsort(all_scores, kind="stable")[:top]
+    return [(int(a_values[i // m]), int(b_values[i % m]), float(all_scores[i])) for i in best]
+
+# the gui is optional, the cipher functions also work headless
+class App(qtw.QMainWindow if qtw is not None else object):
     def __init__(self) -> None:
         super().__init__()
         self.setWindowTitle("affine")
@@ -0,0 +1,469 @@
+from typing import Any, Callable, Iterable, Iterator, NamedTuple, Sequence, TypeVar
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from collections import deque
+from contextlib import ExitStack, nullcontext
+from functools import lru_cache, partial
+import numpy as np
+import itertools
+import quadgrams as qg
+import random
+import string
+import heapq
+import time
+import os
+
+# texts at least this long go through numpy when it is not picked explicitly
+NUMPY_THRESHOLD: int = 1 << 24
+
+Buffer = bytes | bytearray | memoryview
+T = TypeVar("T")
+R = TypeVar("R")
+K = TypeVar("K")
+
+def columnar_order(formatted_key: str) -> tuple[int, ...]:
+    # positions of the key chars in alphabetical order, equal chars keep their order
+    return tuple(sorted(range(len(formatted_key)), key=formatted_key.__getitem__))
+
+class ColumnarTransposition:
+    # the text is written in rows of the key length and read out column by column in key order
+    __slots__ = ("order", "width", "_order_array")
+
+    def __init__(self, order: Sequence[int]) -> None:
+        self.order: tuple[int, ...] = tuple(order)
+        self.width: int = len(self.order)
+        self._order_array: np.ndarray = np.array(self.order, dtype=np.intp)
+
+    def column_lengths(self, length: int) -> list[int]:
+        # lengths of the columns in the order they are read out, the first length % width columns are one longer
+        if self.width <= 0: return []
+        rows, remainder = divmod(length, self.width)
+        return [rows + (i < remainder) for i in self.order]
+
+    def transpose(self, data: Buffer, use_numpy: bool | None = None) -> bytes:
+        if self.width <= 0: return b''
+        if use_numpy is None: use_numpy = len(data) >= NUMPY_THRESHOLD
+        if use_numpy: return self._transpose_numpy(data)
+
+        # every column is one strided slice
+        if isinstance(data, memoryview): data = data.tobytes()
+        return b''.join(data[i::self.width] for i in self.order)
+
+    def untranspose(self, data: Buffer, use_numpy: bool | None = None) -> bytes:
+        if self.width <= 0: return b''
+        if use_numpy is None: use_numpy = len(data) >= NUMPY_THRESHOLD
+        if use_numpy: return self._untranspose_numpy(data)
+
+        # every column goes back to its slots with one extended slice assignment
+        text: bytearray = bytearray(len(data))
+        pos: int = 0
+        for i, length in zip(self.order, self.column_lengths(len(data))):
+            text[i::self.width] = data[pos:pos+length]
+            pos += length
+        return bytes(text)
+
+    def _transpose_numpy(self, data: Buffer) -> bytes:
+        text: np.ndarray = np.frombuffer(data, dtype=np.uint8)
+        rows, remainder = divmod(len(text), self.width)
+        # the full rows are gathered column by column in one indexing step
+        columns: np.ndarray = text[:rows * self.width].reshape(rows, self.width).T[self._order_array]
+        if remainder == 0: return columns.tobytes()
+
+        output: np.ndarray = np.empty(len(text), dtype=np.uint8)
+        pos: int = 0
+        for column, i in zip(columns, self.order):
+            output[pos:pos+rows] = column
+            pos += rows
+            if i < remainder:
+                output[pos] = text[rows * self.width + i]
+                pos += 1
+        return output.tobytes()
+
+    def _untranspose_numpy(self, data: Buffer) -> bytes:
+        cipher: np.ndarray = np.frombuffer(data, dtype=np.uint8)
+        rows, remainder = divmod(len(cipher), self.width)
+        text: np.ndarray = np.empty(len(cipher), dtype=np.uint8)
+        grid: np.ndarray = text[:rows * self.width].reshape(rows, self.width)
+        pos: int = 0
+        for i in self.order:
+            grid[:, i] = cipher[pos:pos+rows]
+            pos += rows
+            if i < remainder:
+                text[rows * self.width + i] = cipher[pos]
+                pos += 1
+        return text.tobytes()
+
+class FractionatingKey:
+    # adfgx and adfgvx, every char becomes its row and column coordinate and the coordinates are transposed
+    __slots__ = (
+        "matrix", "coordinates", "transposition",
+        "_row_table", "_column_table", "_deleted_chars", "_coordinate_table", "_pair_table", "_matrix_chars",
+    )
+
+    def __init__(self, matrix: list[list[str]], coordinates: str, order: Sequence[int]) -> None:
+        self.matrix: list[list[str]] = matrix
+        self.coordinates: str = coordinates
+        self.transposition: ColumnarTransposition = compile_transposition(tuple(order))
+
+        row_table: bytearray = bytearray(range(256))
+        column_table: bytearray = bytearray(range(256))
+        kept_chars: set[int] = set()
+        self._coordinate_table: dict[int, str] = {}
+        self._pair_table: dict[int, int] = {}
+        for i, row in enumerate(matrix[:len(coordinates)]):
+            for j, char in enumerate(row[:len(coordinates)]):
+                # a pair of ascii coordinates read as utf-16 is one code point
+                self._pair_table[ord(coordinates[i]) | ord(coordinates[j]) << 8] = ord(char)
+                # get_coordinates returns the first occurrence of a char
+                if ord(char) in self._coordinate_table: continue
+                self._coordinate_table[ord(char)] = coordinates[i] + coordinates[j]
+                if char.isascii():
+                    row_table[ord(char)] = ord(coordinates[i])
+                    column_table[ord(char)] = ord(coordinates[j])
+                    kept_chars.add(ord(char))
+
+        self._row_table: bytes = bytes(row_table)
+        self._column_table: bytes = bytes(column_table)
+        self._deleted_chars: bytes = bytes(i for i in range(128) if i not in kept_chars)
+        self._matrix_chars: frozenset[str] = frozenset(map(chr, self._pair_table.values()))
+
+    @property
+    def name(self) -> str:
+        return self.coordinates.lower()
+
+    def strip(self, formatted_text: str) -> str:
+        # chars outside the matrix are dropped like get_coordinates dropped them
+        if formatted_text.isascii():
+            return formatted_text.encode("ascii").translate(None, self._deleted_chars).decode("ascii")
+        return ''.join(c for c in formatted_text if ord(c) in self._coordinate_table)
+
+    def fractionate(self, formatted_text: str) -> bytes:
+        if not formatted_text.isascii():
+            formatted_text = self.strip(formatted_text)
+            if not formatted_text.isascii():
+                return formatted_text.translate(self._coordinate_table).encode("ascii")
+
+        text: bytes = formatted_text.encode("ascii")
+        rows: bytes = text.translate(self._row_table, self._deleted_chars)
+        coordinates: bytearray = bytearray(len(rows) * 2)
+        coordinates[0::2] = rows
+        coordinates[1::2] = text.translate(self._column_table, self._deleted_chars)
+        return bytes(coordinates)
+
+    def defractionate(self, coordinates: bytes) -> str:
+        if len(coordinates) % 2 != 0: raise ValueError(f"{self.name} ciphertext has an odd number of coordinates")
+        decrypted_text: str = coordinates.decode("utf-16-le").translate(self._pair_table)
+        # pairs missing from the table stay as they are, they are never ascii
+        if not decrypted_text.isascii():
+            for i, char in enumerate(decrypted_text):
+                if char in self._matrix_chars: continue
+                pair: str = coordinates[i*2:i*2+2].decode("ascii")
+                raise ValueError(f"not an {self.name} coordinate pair: {pair!r}")
+        return decrypted_text
+
+    def encrypt(self, formatted_text: str) -> str:
+        return self.transposition.transpose(self.fractionate(formatted_text)).decode("ascii")
+
+    def decrypt(self, input_text: str) -> str:
+        return self.defractionate(self.transposition.untranspose(input_text.encode("ascii")))
+
+def map_in_order(function: Callable[[T], R], items: Iterable[T], executor: Executor, window: int) -> Iterator[R]:
+    # at most window items are in flight, so long streams are not read ahead into memory
+    pending: deque[Future[R]] = deque()
+    for item in items:
+        pending.append(executor.submit(function, item))
+        if len(pending) >= window: yield pending.popleft().result()
+    while len(pending) > 0: yield pending.popleft().result()
+
+def batched(items: Iterable[T], size: int) -> Iterator[list[T]]:
+    # lists of size items, the last one may be shorter
+    iterator: Iterator[T] = iter(items)
+    while len(batch := list(itertools.islice(iterator, size))) > 0: yield batch
+
+# workers compile the key once when they start, tasks only carry the text
+
+_worker_key: Any = None
+
+def _init_worker(compile_key: Callable[..., Any], key_args: tuple[Any, ...]) -> None:
+    global _worker_key
+    _worker_key = compile_key(*key_args)
+
+def worker_executor(compile_key: Callable[..., Any], key_args: tuple[Any, ...],
+                    processes: int) -> ProcessPoolExecutor | nullcontext[None]:
+    if processes <= 1: return nullcontext()
+    return ProcessPoolExecutor(processes, initializer=_init_worker, initargs=(compile_key, key_args))
+
+def _key_task(function: Callable[[Any, T], R], item: T) -> R:
+    assert _worker_key is not None
+    return function(_worker_key, item)
+
+def map_with_key(function: Callable[[K, T], R], key: K, items: Iterable[T],
+                 executor: ProcessPoolExecutor | None, processes: int) -> Iterator[R]:
+    # function(key, item) for every item, inline or on the workers of worker_executor with their own copy of the key
+    if executor is None: return (function(key, item) for item in items)
+    return map_in_order(partial(_key_task, function), items, executor, processes * 2)
+
+# many messages under one key, sent to the workers in batches so short messages do not pay a round trip each
+
+MESSAGE_BATCH: int = 1024
+
+def _transform_batch(transform: Callable[[K, str], str], key: K, batch: list[str]) -> list[str]:
+    return [transform(key, message) for message in batch]
+
+def map_messages(transform: Callable[[K, str], str], messages: Iterable[str], compile_key: Callable[..., K],
+                 key_args: tuple[Any, ...], processes: int | None, batch_size: int) -> Iterator[str]:
+    # checked here and not in the generator, so a bad argument raises on the call and not on the first message
+    if batch_size <= 0: raise ValueError("message batch size has to be positive")
+    if processes is None: processes = os.cpu_count() or 1
+    return _map_messages(transform, messages, compile_key, key_args, compile_key(*key_args), processes, batch_size)
+
+def _map_messages(transform: Callable[[K, str], str], messages: Iterable[str], compile_key: Callable[..., K],
+                  key_args: tuple[Any, ...], key: K, processes: int, batch_size: int) -> Iterator[str]:
+    with worker_executor(compile_key, key_args, processes) as executor:
+        if executor is None:
+            for message in messages: yield transform(key, message)
+            return
+        batches: Iterator[list[str]] = batched(messages, batch_size)
+        for batch in map_with_key(partial(_transform_batch, transform), key, batches, executor, processes):
+            yield from batch
+
+@lru_cache(maxsize=128)
+def compile_transposition(order: tuple[int, ...]) -> ColumnarTransposition:
+    return ColumnarTransposition(order)
+
+# cryptanalysis
+
+# key lengths up to this one are searched through every column order, longer ones by hill climbing
+ENUMERATION_LIMIT: int = 8
+# random starts of the hill climb for each longer key length, single climbs stall on a wrong pairing of columns
+CLIMBS: int = 64
+# best column orders by index of coincidence that go on to the substitution solve, even key lengths
+# tie on the index whenever whole column pairs swap places so there are many near the top
+CANDIDATES: int = 16
+# letters a recovered column order is written back with, adfgx reads j as i so it is left out
+KEY_LETTERS: str = string.ascii_lowercase.replace('j', '')
+# quadgram code of every plaintext char outside a-z
+_OTHER: int = 26
+
+class SolverResult(NamedTuple):
+    key1: str
+    key2: str
+    plaintext: str
+    index_of_coincidence: float
+    score: float
+    candidates: int
+    seconds: float
+
+def columnar_key(order: Sequence[int]) -> str:
+    # a key whose chars sort into the order, so create_columnar_key gives it back
+    if len(order) > len(KEY_LETTERS): raise ValueError(f"column orders longer than {len(KEY_LETTERS)} cannot be written as a key")
+    key: list[str] = [''] * len(order)
+    for rank, position in enumerate(order): key[position] = KEY_LETTERS[rank]
+    return ''.join(key)
+
+def index_of_coincidence(pairs: np.ndarray, symbols: int) -> float:
+    if len(pairs) < 2: return 0.0
+    counts: np.ndarray = np.bincount(pairs, minlength=symbols)
+    return float((counts * (counts - 1)).sum()) / (len(pairs) * (len(pairs) - 1))
+
+def _cipher_symbols(input_text: str, coordinates: str) -> bytes:
+    text: str = ''.join(input_text.split()).upper()
+    invalid: set[str] = set(text) - set(coordinates)
+    if len(invalid) > 0: raise ValueError(f"not {coordinates.lower()} coordinates: {''.join(sorted(invalid))!r}")
+    if len(text) % 2 != 0: raise ValueError(f"{coordinates.lower()} ciphertext has an odd number of coordinates")
+    if len(text) < 4: raise ValueError(f"{coordinates.lower()} ciphertext is too short to solve")
+    return text.translate({ord(c): i for i, c in enumerate(coordinates)}).encode("latin-1")
+
+def _pairs(symbols: bytes, order: Sequence[int], size: int) -> np.ndarray:
+    # coordinate pairs of the untransposed text as symbols row * size + column
+    coordinates: np.ndarray = np.frombuffer(ColumnarTransposition(order).untranspose(symbols), dtype=np.uint8).astype(np.intp)
+    return coordinates[0::2] * size + coordinates[1::2]
+
+def _enumerate_orders(symbols: bytes, size: int, length: int, first: int) -> tuple[list[tuple[float, tuple[int, ...]]], int]:
+    # every order that starts with the first column, the pool splits a key length by its first column
+    best: list[tuple[float, tuple[int, ...]]] = []
+    orders: int = 0
+    for rest in itertools.permutations([i for i in range(length) if i != first]):
+        order: tuple[int, ...] = (first, *rest)
+        candidate: tuple[float, tuple[int, ...]] = (index_of_coincidence(_pairs(symbols, order, size), size * size), order)
+        if len(best) < CANDIDATES: heapq.heappush(best, candidate)
+        else: heapq.heappushpop(best, candidate)
+        orders += 1
+    return best, orders
+
+def _climb_orders(symbols: bytes, size: int, length: int, seed: int) -> tuple[list[tuple[float, tuple[int, ...]]], int]:
+    rng = random.Random(seed)
+    order: list[int] = list(range(length))
+    rng.shuffle(order)
+    best: float = index_of_coincidence(_pairs(symbols, order, size), size * size)
+    orders: int = 1
+
+    improved: bool = True
+    while improved:
+        improved = False
+        for i, j in itertools.combinations(range(length), 2):
+            order[i], order[j] = order[j], order[i]
+            score: float = index_of_coincidence(_pairs(symbols, order, size), size * size)
+            orders += 1
+            if score > best:
+                best, improved = score, True
+            else: order[i], order[j] = order[j], order[i]
+
+    return [(best, tuple(order))], orders
+
+@lru_cache(maxsize=1)
+def _default_quadgram_table() -> np.ndarray:
+    return qg.quadgram_table(qg.load_quadgrams(qg.CHAR_MAP_PATH), _OTHER + 1)
+
+def _letter_ranking(counts: dict[str, int]) -> str:
+    # letters by how often they start a quadgram, the frequency analysis start of the substitution
+    letters: dict[str, int] = {c: 0 for c in string.ascii_lowercase}
+    for quadgram, count in counts.items():
+        if quadgram[0] in letters: letters[quadgram[0]] += count
+    return ''.join(sorted(letters, key=lambda c: -letters[c]))
+
+def _quadgram_codes(text: str) -> np.ndarray:
+    return np.array([ord(c) - ord('a') if 'a' <= c <= 'z' else _OTHER for c in text], dtype=np.intp)
+
+class _Substitution:
+    # symbol i of the untransposed text decrypts to cells[mapping[i]], the column order can still change
+    __slots__ = ("symbols", "size", "table", "codes", "padding", "order", "mapping", "pairs", "score")
+
+    def __init__(self, symbols: bytes, size: int, table: np.ndarray, cells: str, ranking: str,
+                 order: Sequence[int], padding: str) -> None:
+        self.symbols: bytes = symbols
+        self.size: int = size
+        self.table: np.ndarray = table
+        self.codes: np.ndarray = _quadgram_codes(cells)
+        self.padding: np.ndarray = _quadgram_codes(padding)
+        self.order: list[int] = list(order)
+        self.pairs: np.ndarray = _pairs(symbols, self.order, size)
+
+        # the most frequent symbols get the most frequent letters
+        ranked_cells: list[int] = sorted(range(len(cells)), key=lambda i: ranking.index(cells[i]) if cells[i] in ranking else len(ranking))
+        frequent_symbols: list[int] = list(np.argsort(-np.bincount(self.pairs, minlength=len(cells)), kind="stable"))
+        self.mapping: np.ndarray = np.empty(len(cells), dtype=np.intp)
+        self.mapping[frequent_symbols] = ranked_cells
+        self.score: float = self.rescore()
+
+    def rescore(self) -> float:
+        plain: np.ndarray = np.concatenate((self.padding, self.codes[self.mapping][self.pairs], self.padding))
+        quadgrams: np.ndarray = ((plain[:-3] * 27 + plain[1:-2]) * 27 + plain[2:-1]) * 27 + plain[3:]
+        return float(self.table[quadgrams].sum())
+
+    def climb(self) -> None:
+        # swaps two cells of the square or two columns while either improves the score
+        used: list[int] = [int(i) for i in np.unique(self.pairs)]
+        improved: bool = True
+        while improved:
+            improved = False
+            for i in used:
+                for j in range(len(self.mapping)):
+                    if i == j: continue
+                    self.mapping[i], self.mapping[j] = self.mapping[j], self.mapping[i]
+                    score: float = self.rescore()
+                    if score > self.score:
+                        self.score, improved = score, True
+                    else: self.mapping[i], self.mapping[j] = self.mapping[j], self.mapping[i]
+
+            for i, j in itertools.combinations(range(len(self.order)), 2):
+                self.order[i], self.order[j] = self.order[j], self.order[i]
+                pairs: np.ndarray = self.pairs
+                self.pairs = _pairs(self.symbols, self.order, self.size)
+                score = self.rescore()
+                if score > self.score:
+                    self.score, improved = score, True
+                else:
+                    self.order[i], self.order[j] = self.order[j], self.order[i]
+                    self.pairs = pairs
+            if improved: used = [int(i) for i in np.unique(self.pairs)]
+
+    def perturb(self, rng: random.Random, swaps: int) -> None:
+        for _ in range(swaps):
+            i, j = rng.sample(range(len(self.mapping)), 2)
+            self.mapping[i], self.mapping[j] = self.mapping[j], self.mapping[i]
+        self.score = self.rescore()
+
+def _solve_substitution(symbols: bytes, size: int, table: np.ndarray, cells: str, ranking: str,
+                        order: tuple[int, ...], padding: str, seed: int, restarts: int) -> tuple[float, list[int], list[int]]:
+    rng = random.Random(seed)
+    substitution: _Substitution = _Substitution(symbols, size, table, cells, ranking, order, padding)
+    substitution.climb()
+    best: tuple[float, list[int], list[int]] = (substitution.score, list(substitution.order), list(substitution.mapping))
+
+    # restarts shake the best square a little and climb again, until that many in a row bring no improvement
+    stalled: int = 0
+    while stalled < restarts:
+        substitution.order, substitution.mapping = list(best[1]), np.array(best[2], dtype=np.intp)
+        substitution.pairs = _pairs(symbols, substitution.order, size)
+        substitution.perturb(rng, 4)
+        substitution.climb()
+        stalled += 1
+        if substitution.score > best[0]:
+            best = (substitution.score, list(substitution.order), list(substitution.mapping))
+            stalled = 0
+
+    return best
+
+_solver_table: np.ndarray | None = None
+
+def _init_solver(table: np.ndarray) -> None:
+    global _solver_table
+    _solver_table = table
+
+def _solve_candidate(symbols: bytes, size: int, cells: str, ranking: str,
+                     order: tuple[int, ...], padding: str, seed: int, restarts: int) -> tuple[float, list[int], list[int]]:
+    table: np.ndarray = _solver_table if _solver_table is not None else _default_quadgram_table()
+    return _solve_substitution(symbols, size, table, cells, ranking, order, padding, seed, restarts)
+
+def solve(input_text: str, coordinates: str, cells: str, key_lengths: Iterable[int] = range(2, 11),
+          processes: int | None = None, restarts: int = 8, seed: int | None = None,
+          quadgrams: dict[str, int] | None = None, padding: str = '') -> SolverResult:
+    # the column order comes from the index of coincidence of the coordinate pairs, the square from quadgrams,
+    # the plaintext is scored with padding on both ends so a formatted space favours readings that end on a word
+    start: float = time.perf_counter()
+    size: int = len(coordinates)
+    if len(cells) != size * size: raise ValueError(f"a {size}x{size} square needs {size * size} chars, got {len(cells)}")
+    symbols: bytes = _cipher_symbols(input_text, coordinates)
+    if processes is None: processes = os.cpu_count() or 1
+    rng = random.Random(seed)
+
+    searches: list[tuple[Callable[..., Any], tuple[Any, ...]]] = []
+    for length in key_lengths:
+        if not 1 <= length <= len(KEY_LETTERS): raise ValueError(f"key lengths have to be between 1 and {len(KEY_LETTERS)}")
+        if length <= ENUMERATION_LIMIT:
+            searches += [(_enumerate_orders, (symbols, size, length, first)) for first in range(length)]
+        else:
+            searches += [(_climb_orders, (symbols, size, length, rng.randrange(1 << 32))) for _ in range(CLIMBS)]
+
+    # quadgrams default to char_map formatted text, the plaintext format of adfgx and adfgvx
+    counts: dict[str, int] = dict(quadgrams) if quadgrams is not None else qg.load_quadgrams(qg.CHAR_MAP_PATH)
+    table: np.ndarray = qg.quadgram_table(counts, _OTHER + 1) if quadgrams is not None else _default_quadgram_table()
+    ranking: str = _letter_ranking(counts)
+
+    executor: ProcessPoolExecutor | None = None
+    with ExitStack() as stack:
+        if processes > 1: executor = stack.enter_context(ProcessPoolExecutor(processes, initializer=_init_solver, initargs=(table,)))
+
+        def run(calls: list[tuple[Callable[..., Any], tuple[Any, ...]]]) -> list[Any]:
+            if executor is None: return [function(*args) for function, args in calls]
+            return [future.result() for future in [executor.submit(function, *args) for function, args in calls]]
+
+        # an order found by more than one search only counts once
+        orders: int = 0
+        scored: dict[tuple[int, ...], float] = {}
+        for best, searched in run(searches):
+            orders += searched
+            for index, order in best: scored[order] = index
+        candidates: list[tuple[float, tuple[int, ...]]] = heapq.nlargest(CANDIDATES, ((index, order) for order, index in scored.items()))
+
+        solutions: list[tuple[float, list[int], list[int]]] = run([
+            (_solve_candidate, (symbols, size, cells, ranking, order, padding, rng.randrange(1 << 32), restarts)) if executor is not None
+            else (_solve_substitution, (symbols, size, table, cells, ranking, order, padding, rng.randrange(1 << 32), restarts))
+            for _, order in candidates
+        ])
+
+    score, order, mapping = max(solutions, key=lambda solution: solution[0])
+    square: list[str] = [cells[mapping[i]] for i in range(size * size)]
+    plaintext: str = ''.join(square[pair] for pair in _pairs(symbols, order, size))
+    index: float = index_of_coincidence(_pairs(symbols, order, size), size * size)
+    return SolverResult(''.join(square), columnar_key(order), plaintext, index, score, orders, time.perf_counter() - start)
@@ -1,7 +1,9 @@
-from PySide6 import QtWidgets as qtw
+try: from PySide6 import QtWidgets as qtw
+except ImportError: qtw = None
 from hashlib import sha3_512
 import zipfile
 import base64
+import ast
 import rsa
 import sys
 import os
@@ -10,6 +12,7 @@ import os
 
 def main():
     if len(sys.argv) == 1:
+        if qtw is None: sys.exit("PySide6 is required for the gui")
         app = qtw.QApplication(sys.argv)
 
         stylesheet_path = "../stylesheet"
@@ -38,12 +41,15 @@ def hash_file(file_path: str) -> str:
             hasher.update(chunk)
     return hasher.hexdigest()
 
-def sign_file(file_path: str, private_key: tuple[int, int]) -> str:
+def sign_file(file_path: str, private_key: rsa.Key, mode: str = "packed") -> str:
     file_hash = hash_file(file_path)
-    encrypted_blocks = rsa.encrypt(file_hash, private_key)
+    encrypted_blocks = rsa.encrypt(file_hash, private_key, mode)
     return base64.b64encode(str(encrypted_blocks).encode()).decode()
 
-def verify_signature(file_path: str, signature: str, public_key: tuple[int, int]) -> bool:
+# mode None accepts both block modes, so signatures made before packed blocks still verify
+def verify_signature(file_path: str, signature: str, public_key: tuple[int, int], mode: str | None = None) -> bool:
+    if mode is not None and mode not in rsa.BLOCK_MODES:
+        raise ValueError(f"unknown rsa block mode {mode!r}, expected one of {rsa.BLOCK_MODES}")
     if signature.startswith('rsa_sha3-512 '):
         signature = signature.split(' ')[1]
 
@@ -53,11 +59,18 @@ def verify_signature(file_path: str, signature: str, public_key: tuple[int, int]
     if padding != 0: 
         signature += '=' * (4 - padding)
     
-    decoded_str = base64.b64decode(signature).decode()
-    encrypted_blocks = eval(decoded_str)
-    decrypted_hash = rsa.decrypt(encrypted_blocks, public_key)
+    # a signature that is no base64 encoded list of ints is a bad one, literal_eval never runs code from it
+    try: encrypted_blocks = ast.literal_eval(base64.b64decode(signature).decode())
+    except (SyntaxError, ValueError): return False
+    if not isinstance(encrypted_blocks, list) or not all(type(block) is int for block in encrypted_blocks): return False
 
-    return decrypted_hash == file_hash
+    for block_mode in rsa.BLOCK_MODES if mode is None else (mode,):
+        # a wrong key, a tampered signature or the other block mode decrypt to no packed block or no utf-8
+        try: decrypted_hash = rsa.decrypt(encrypted_blocks, public_key, block_mode)
+        except ValueError: continue
+        if decrypted_hash == file_hash: return True
+
+    return False
 
 def save_keys(public_key: tuple[int, int], private_key: tuple[int, int], save_dir: str) -> None:
     public_key_path = os.path.join(save_dir, "key.pub")
@@ -88,7 +101,8 @@ def package_signed_file(file_path: str, signature: str, save_dir: str) -> None:
 
     os.remove(sign_path)
 
-class App(qtw.QMainWindow):
+# the gui is optional, the cipher functions also work headless
+class App(qtw.QMainWindow if qtw is not None else object):
     def __init__(self):
         super().__init__()
         self.setWindowTitle("dsa")
@@ -135,7 +149,7 @@ class App(qtw.QMainWindow):
 
         self.main_layout.addStretch()
 
-        self.private_key: tuple[int, int] | None = None
+        self.private_key: rsa.Key | None = None
         self.public_key: tuple[int, int] | None = None
         self.file_path: str | None = None
 
@@ -1,17 +1,35 @@
-from typing import Any
+from typing import Any, BinaryIO, Callable, Iterable, Iterator, Mapping, NamedTuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
+from collections import Counter
+from quadgrams import quadgram_table
 import text_formatter as tf
-import PySide6.QtWidgets as qtw
-import PySide6.QtCore as qtc
+import quadgrams as qg
+try:
+    import PySide6.QtWidgets as qtw
+    import PySide6.QtCore as qtc
+except ImportError:
+    qtw = qtc = None
 import unicodedata
+import operator
+import re
+import numpy as np
+import random
 import string
+import math
+import time
 import sys
+import os
 
 config: dict[str, Any] = {
-    "alphabet": string.ascii_lowercase.replace('j', '')
+    "alphabet": string.ascii_lowercase.replace('j', ''),
+    # 6x6 matrix, digits and j are encrypted as they are instead of spelled out or folded into i
+    "alphanumeric_alphabet": string.ascii_lowercase + string.digits,
 }
 
 def main() -> None: 
     if len(sys.argv) == 1:
+        if qtw is None: sys.exit("PySide6 is required for the gui")
         app = qtw.QApplication(sys.argv)
 
         stylesheet_path = "../stylesheet"
@@ -36,79 +54,533 @@ def main() -> None:
         case "-f" | "-format": print('format')
         case _: print("unknown argument")
 
-def format_text(input_text: str) -> str:
+# every q of the formatted text starts a two char marker, so fillers and escapes come back out exactly
+MARKERS: dict[str, str] = {'qv': 'q', 'qi': 'j', 'qz': '', 'qy': ''}
+PADDING: str = 'q'
+_repeated_chars: re.Pattern[str] = re.compile(r'(.)(?=\1)', re.DOTALL)
+_markers: tf.CharMapMatcher = tf.CharMapMatcher({**MARKERS, PADDING: ''})
+
+def matrix_size(alphabet: str) -> int:
+    return math.isqrt(len(alphabet))
+
+@lru_cache(maxsize=16)
+def _compile_format_mode(alphabet: str) -> tuple[tf.CharMapCodec, dict[str, str]]:
+    # the 5x5 alphabet spells digits out and escapes j, an alphabet with digits only spells out spaces
+    codec: tf.CharMapCodec = tf.get_codec(
+        "space_char_map" if any(c.isdigit() for c in alphabet) else "nonrepeating_char_map"
+    )
+    # q always needs its escape, it has to go first so the q of the other markers is not escaped again
+    escapes: dict[str, str] = {
+        char: marker for marker, char in MARKERS.items()
+        if len(char) > 0 and (char == 'q' or char not in alphabet)
+    }
+    return codec, escapes
+
+def _format_mode(alphabet: str | None) -> tuple[tf.CharMapCodec, dict[str, str]]:
+    return _compile_format_mode(config["alphabet"] if alphabet is None else alphabet)
+
+def _filler(char: str) -> str:
+    # the char and the filler that keeps it apart from its twin
+    return char + ('qy' if char == 'z' else 'qz')
+
+def _insert_fillers(input_text: str, escapes: Mapping[str, str]) -> str:
+    for char, marker in escapes.items(): input_text = input_text.replace(char, marker)
+    # split at every repeated pair, the captured first char picks the filler
+    parts: list[str] = _repeated_chars.split(input_text)
+    parts[1::2] = map(_filler, parts[1::2])
+    return ''.join(parts)
+
+def format_text(input_text: str, alphabet: str | None = None) -> str:
     if len(input_text) <= 0: return input_text
-    char_map: dict[str, str] = tf.get_nonrepeating_char_map()
+    codec, escapes = _format_mode(alphabet)
 
-    formatted_text: str = ''
-    formatted_text = tf.normalize_text(input_text, char_map = char_map)
-    formatted_text = tf.format_repeating_chars(formatted_text)
-    formatted_text = tf.even_length(formatted_text)
-    formatted_text = formatted_text.replace('j', 'i')
+    # no two neighbouring chars are the same afterwards, so every digraph is valid whatever the alignment
+    formatted_text: str = _insert_fillers(codec.normalize(input_text), escapes)
+    if len(formatted_text) % 2 != 0: formatted_text += PADDING
 
     return formatted_text
 
+def revert_format(formatted_text: str, alphabet: str | None = None) -> str:
+    return _format_mode(alphabet)[0].decode(_markers.replace(formatted_text))
+
+def _insert_fillers_chunks(chunks: Iterable[str], escapes: Mapping[str, str]) -> Iterator[str]:
+    # the last char waits for the next chunk, its marker depends on the char after it
+    length: int = 0
+    carry: str = ''
+    for chunk in chunks:
+        if len(chunk) <= 0: continue
+        buffer: str = carry + chunk
+        carry = buffer[-1]
+        formatted_text: str = _insert_fillers(buffer, escapes)
+        formatted_text = formatted_text[:len(formatted_text) - len(escapes.get(carry, carry))]
+        length += len(formatted_text)
+        if len(formatted_text) > 0: yield formatted_text
+
+    if len(carry) <= 0: return
+    formatted_text = escapes.get(carry, carry)
+    length += len(formatted_text)
+    yield formatted_text if length % 2 == 0 else formatted_text + PADDING
+
+def format_text_chunks(chunks: Iterable[str], alphabet: str | None = None) -> Iterator[str]:
+    codec, escapes = _format_mode(alphabet)
+    return _insert_fillers_chunks(codec.normalizer.stream(chunks), escapes)
+
+def revert_format_chunks(chunks: Iterable[str], alphabet: str | None = None) -> Iterator[str]:
+    return _format_mode(alphabet)[0].decode_chunks(_markers.replace_chunks(chunks))
+
 def create_key_matrix(key: str, alphabet: str) -> list[list[str]]:
-    key = key.lower().replace('j', 'i')
+    # the alphabet picks the matrix, 25 letters make the 5x5 one and 36 letters and digits the 6x6 one
+    size: int = matrix_size(alphabet)
+    key = key.lower()
+    if 'j' not in alphabet: key = key.replace('j', 'i')
     key_matrix: list[str] = [
         c for c in unicodedata.normalize('NFD', key) 
-        if c.isalpha() and unicodedata.category(c) != 'Mn'
+        if (c.isalpha() or c in alphabet) and unicodedata.category(c) != 'Mn'
     ]
     key_matrix = sorted(set(key_matrix), key = lambda x: key_matrix.index(x))
     key_matrix += [x for x in alphabet if x not in key_matrix]
-    return [key_matrix[i:i+5] for i in range(0, 25, 5)]
+    return [key_matrix[i:i+size] for i in range(0, size * size, size)]
 
 def get_coordinates(matrix: list[list[str]], char: str) -> tuple[int, int]:
-    if char == 'j': char = 'i'
     for i, row in enumerate(matrix):
         if char in row: return (i, row.index(char))
+    # a matrix without j encrypts it as i
+    if char == 'j': return get_coordinates(matrix, 'i')
     return (-1, -1)
 
+def get_digraph(matrix: list[list[str]], char_a: tuple[int, int], char_b: tuple[int, int], shift: int) -> str:
+    size: int = len(matrix)
+    if char_a[0] == char_b[0]:
+        return matrix[char_a[0]][(char_a[1] + shift) % size] + matrix[char_b[0]][(char_b[1] + shift) % size]
+    elif char_a[1] == char_b[1]:
+        return matrix[(char_a[0] + shift) % size][char_a[1]] + matrix[(char_b[0] + shift) % size][char_b[1]]
+    return matrix[char_a[0]][char_b[1]] + matrix[char_b[0]][char_a[1]]
+
+class _DigraphTable(dict[str, str]):
+    # pairs with chars outside the matrix are rare, they are computed like before on first use
+    def __init__(self, matrix: list[list[str]], positions: dict[str, tuple[int, int]], shift: int) -> None:
+        super().__init__()
+        self.matrix: list[list[str]] = matrix
+        self.positions: dict[str, tuple[int, int]] = positions
+        self.shift: int = shift
+
+    def __missing__(self, pair: str) -> str:
+        char_a: tuple[int, int] = self.positions.get(pair[0], (-1, -1))
+        char_b: tuple[int, int] = self.positions.get(pair[1], (-1, -1))
+        digraph: str = get_digraph(self.matrix, char_a, char_b, self.shift)
+        self[pair] = digraph
+        return digraph
+
+class PlayfairKey:
+    __slots__ = ("key", "alphabet", "matrix", "positions", "_encrypt_table", "_decrypt_table")
+
+    def __init__(self, key: str, alphabet: str) -> None:
+        self.key: str = key
+        self.alphabet: str = alphabet
+        self.matrix: list[list[str]] = create_key_matrix(key, alphabet)
+
+        self.positions: dict[str, tuple[int, int]] = {}
+        for i, row in enumerate(self.matrix):
+            for j, char in enumerate(row): self.positions.setdefault(char, (i, j))
+        # get_coordinates looks j up as i when the matrix has no j
+        if 'j' not in self.positions and 'i' in self.positions: self.positions['j'] = self.positions['i']
+
+        self._encrypt_table: _DigraphTable = _DigraphTable(self.matrix, self.positions, 1)
+        self._decrypt_table: _DigraphTable = _DigraphTable(self.matrix, self.positions, -1)
+        for char_a in self.positions:
+            for char_b in self.positions:
+                try:
+                    self._encrypt_table[char_a + char_b]
+                    self._decrypt_table[char_a + char_b]
+                except IndexError: pass
+
+    @staticmethod
+    def _translate(formatted_text: str, table: _DigraphTable) -> str:
+        return ''.join(map(table.__getitem__, map(operator.add, formatted_text[0::2], formatted_text[1::2])))
+
+    @staticmethod
+    def _translate_chunks(chunks: Iterable[str], table: _DigraphTable) -> Iterator[str]:
+        # a digraph split between two chunks waits for its second char
+        carry: str = ''
+        for chunk in chunks:
+            buffer: str = carry + chunk
+            end: int = len(buffer) - len(buffer) % 2
+            carry = buffer[end:]
+            if end > 0: yield PlayfairKey._translate(buffer[:end], table)
+
+    def encrypt(self, formatted_text: str) -> str:
+        return self._translate(formatted_text, self._encrypt_table)
+
+    def decrypt(self, formatted_text: str) -> str:
+        return self._translate(formatted_text, self._decrypt_table)
+
+    def encrypt_chunks(self, chunks: Iterable[str]) -> Iterator[str]:
+        return self._translate_chunks(chunks, self._encrypt_table)
+
+    def decrypt_chunks(self, chunks: Iterable[str]) -> Iterator[str]:
+        return self._translate_chunks(chunks, self._decrypt_table)
+
+@lru_cache(maxsize=128)
+def compile_key(key: str, alphabet: str) -> PlayfairKey:
+    return PlayfairKey(key, alphabet)
+
 def encrypt(input_text: str, key: str, alphabet: str) -> str:
     if len(input_text) <= 0: return input_text
 
-    matrix: list[list[str]] = create_key_matrix(key, alphabet)
-    formatted_text: str = format_text(input_text)
-    encrypted_text: list[str] = []
-
-    for i in range(0, len(formatted_text), 2):
-        char_a: tuple[int, int] = get_coordinates(matrix, formatted_text[i])
-        char_b: tuple[int, int] = get_coordinates(matrix, formatted_text[i+1])
-
-        if char_a[0] == char_b[0]:
-            encrypted_text.append(matrix[char_a[0]][(char_a[1] + 1) % 5] + matrix[char_b[0]][(char_b[1] + 1) % 5])
-        elif char_a[1] == char_b[1]:
-            encrypted_text.append(matrix[(char_a[0] + 1) % 5][char_a[1]] + matrix[(char_b[0] + 1) % 5][char_b[1]])
-        else:
-            encrypted_text.append(matrix[char_a[0]][char_b[1]] + matrix[char_b[0]][char_a[1]])
-
-    return ''.join(encrypted_text)
+    formatted_text: str = format_text(input_text, alphabet)
+    return compile_key(key, alphabet).encrypt(formatted_text)
 
 def decrypt(input_text: str, key: str, alphabet: str) -> str:
     if len(input_text) <= 0: return input_text
 
-    matrix: list[list[str]] = create_key_matrix(key, alphabet)
     formatted_text: str = tf.even_length(input_text.lower())
-    decrypted_text: list[str] = []
-
-    for i in range(0, len(formatted_text), 2):
-        char_a: tuple[int, int] = get_coordinates(matrix, formatted_text[i])
-        char_b: tuple[int, int] = get_coordinates(matrix, formatted_text[i+1])
-
-        if char_a[0] == char_b[0]:
-            decrypted_text.append(matrix[char_a[0]][(char_a[1] - 1) % 5] + matrix[char_b[0]][(char_b[1] - 1) % 5])
-        elif char_a[1] == char_b[1]:
-            decrypted_text.append(matrix[(char_a[0] - 1) % 5][char_a[1]] + matrix[(char_b[0] - 1) % 5][char_b[1]])
-        else:
-            decrypted_text.append(matrix[char_a[0]][char_b[1]] + matrix[char_b[0]][char_a[1]])
-
-    decrypted_text = list(tf.revert_repeating_chars(''.join(decrypted_text)))
-    decrypted_text = list(tf.replace_char_map_values(''.join(decrypted_text), tf.get_nonrepeating_char_map()))
-    decrypted_text = list(tf.revert_even_length(''.join(decrypted_text)))
+    return revert_format(compile_key(key, alphabet).decrypt(formatted_text), alphabet)
+
+def encrypt_chunks(chunks: Iterable[str], key: str, alphabet: str) -> Iterator[str]:
+    return compile_key(key, alphabet).encrypt_chunks(format_text_chunks(chunks, alphabet))
+
+def decrypt_chunks(chunks: Iterable[str], key: str, alphabet: str) -> Iterator[str]:
+    formatted_chunks: Iterator[str] = tf.even_length_chunks(chunk.lower() for chunk in chunks)
+    return revert_format_chunks(compile_key(key, alphabet).decrypt_chunks(formatted_chunks), alphabet)
+
+def encrypt_file(source: str | os.PathLike | BinaryIO, target: str | os.PathLike | BinaryIO,
+                 key: str, alphabet: str, chunk_size: int = tf.CHUNK_SIZE) -> int:
+    return tf.transform_file(source, target, lambda chunks: encrypt_chunks(chunks, key, alphabet), chunk_size)
+
+def decrypt_file(source: str | os.PathLike | BinaryIO, target: str | os.PathLike | BinaryIO,
+                 key: str, alphabet: str, chunk_size: int = tf.CHUNK_SIZE) -> int:
+    return tf.transform_file(source, target, lambda chunks: decrypt_chunks(chunks, key, alphabet), chunk_size)
+
+# cryptanalysis
+
+# quadgrams of playfair formatted text, with the fillers and escapes format_text adds,
+# rebuild after a change to format_text with qg.save_quadgrams(train_quadgrams(qg.training_corpus()), QUADGRAMS_PATH, min_count=3)
+QUADGRAMS_PATH: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "quadgrams.txt")
+# formatted plaintext spells every space out, which gives the solver a crib to start from
+SPACE_CRIB: str = tf.get_codec("nonrepeating_char_map").char_map[' ']
+CRIB_PROBES: int = 32
+CRIB_STEPS: int = 2000
+CRIB_TEMPERATURE: float = 3.0
+
+class SolverProgress(NamedTuple):
+    restart: int
+    restarts: int
+    score: float
+    best_score: float
+    elapsed: float
+
+class SolverResult(NamedTuple):
+    key: str
+    plaintext: str
+    score: float
+    restarts: int
+    iterations: int
+    seconds: float
+    time_to_solution: float
+    restart_scores: list[float]
+
+def train_quadgrams(input_text: str) -> dict[str, int]:
+    return qg.train_quadgrams(input_text, format_text)
+
+def load_quadgrams(path: str = QUADGRAMS_PATH) -> dict[str, int]:
+    return qg.load_quadgrams(path)
+
+@lru_cache(maxsize=1)
+def _default_quadgram_table() -> np.ndarray:
+    return quadgram_table(load_quadgrams())
+
+def _digraph_positions(shift: int) -> tuple[np.ndarray, np.ndarray]:
+    # matrix positions a digraph turns into, for every pair of flat positions
+    first: list[int] = []
+    second: list[int] = []
+    for a in range(25):
+        for b in range(25):
+            (row_a, col_a), (row_b, col_b) = divmod(a, 5), divmod(b, 5)
+            if row_a == row_b:
+                first.append(row_a * 5 + (col_a + shift) % 5)
+                second.append(row_b * 5 + (col_b + shift) % 5)
+            elif col_a == col_b:
+                first.append((row_a + shift) % 5 * 5 + col_a)
+                second.append((row_b + shift) % 5 * 5 + col_b)
+            else:
+                first.append(row_a * 5 + col_b)
+                second.append(row_b * 5 + col_a)
+    return np.array(first, dtype=np.intp), np.array(second, dtype=np.intp)
+
+_ENCRYPT_FIRST, _ENCRYPT_SECOND = _digraph_positions(1)
+_DECRYPT_FIRST, _DECRYPT_SECOND = _digraph_positions(-1)
+_FLAT_POSITIONS: np.ndarray = np.arange(25, dtype=np.intp)
+
+class _Annealer:
+    # the key is a flat grid of letter codes mutated in place, every move is its own inverse
+    __slots__ = ("table", "first", "second", "grid", "rows", "positions", "plain", "score", "best_grid", "best_score")
+
+    def __init__(self, cipher: np.ndarray, table: np.ndarray, grid: np.ndarray) -> None:
+        self.table: np.ndarray = table
+        self.first: np.ndarray = cipher[0::2]
+        self.second: np.ndarray = cipher[1::2]
+        self.grid: np.ndarray = grid
+        self.rows: np.ndarray = grid.reshape(5, 5)
+        self.positions: np.ndarray = np.zeros(26, dtype=np.intp)
+        self.positions[grid] = _FLAT_POSITIONS
+        self.plain: np.ndarray = np.empty(len(cipher), dtype=np.intp)
+        self.score: float = self.rescore()
+        self.best_grid: np.ndarray = grid.copy()
+        self.best_score: float = self.score
+
+    def rescore(self) -> float:
+        # decrypts into the same buffer and scores every quadgram, no strings are built
+        plain: np.ndarray = self.plain
+        keys: np.ndarray = self.positions[self.first] * 25 + self.positions[self.second]
+        plain[0::2] = self.grid[_DECRYPT_FIRST[keys]]
+        plain[1::2] = self.grid[_DECRYPT_SECOND[keys]]
+        return float(self.table[((plain[:-3] * 26 + plain[1:-2]) * 26 + plain[2:-1]) * 26 + plain[3:]].sum())
+
+    def run(self, rng: random.Random, temperature: float, steps: int) -> None:
+        for _ in range(steps):
+            undo: Callable[[], None] = self.mutate(rng)
+            score: float = self.rescore()
+            delta: float = score - self.score
+            if delta >= 0 or rng.random() < math.exp(delta / temperature):
+                self.score = score
+                if score > self.best_score:
+                    self.best_score = score
+                    self.best_grid[:] = self.grid
+            else: undo()
+
+    def swap_letters(self, a: int, b: int) -> None:
+        grid: np.ndarray = self.grid
+        grid[a], grid[b] = grid[b], grid[a]
+        self.positions[grid[a]] = a
+        self.positions[grid[b]] = b
+
+    def swap_rows(self, a: int, b: int) -> None:
+        self.rows[[a, b]] = self.rows[[b, a]]
+        self.positions[self.grid] = _FLAT_POSITIONS
+
+    def swap_columns(self, a: int, b: int) -> None:
+        self.rows[:, [a, b]] = self.rows[:, [b, a]]
+        self.positions[self.grid] = _FLAT_POSITIONS
+
+    def reverse(self, a: int, b: int) -> None:
+        self.grid[:] = self.grid[::-1].copy()
+        self.positions[self.grid] = _FLAT_POSITIONS
+
+    def mutate(self, rng: random.Random) -> Callable[[], None]:
+        # mostly letter swaps, the whole row and column moves get the key out of local maxima
+        move: Callable[[int, int], None]
+        match rng.randrange(50):
+            case 0: move = self.swap_rows
+            case 1: move = self.swap_columns
+            case 2: move = self.reverse
+            case _: move = self.swap_letters
+        a: int = rng.randrange(25 if move == self.swap_letters else 5)
+        b: int = rng.randrange(25 if move == self.swap_letters else 5)
+        move(a, b)
+        return lambda: move(a, b)
+
+def _cipher_codes(input_text: str, alphabet: str) -> np.ndarray:
+    if len(alphabet) != 25 or len(set(alphabet)) != 25 or not all('a' <= c <= 'z' for c in alphabet):
+        raise ValueError("the solver needs a 5x5 alphabet of 25 distinct letters a-z")
+
+    formatted_text: str = input_text.lower()
+    if 'j' not in alphabet: formatted_text = formatted_text.replace('j', 'i')
+    formatted_text = tf.even_length(''.join(c for c in formatted_text if c in alphabet))
+    if len(formatted_text) < 4: raise ValueError("the ciphertext is too short to score")
+
+    return np.frombuffer(formatted_text.encode("ascii"), dtype=np.uint8).astype(np.intp) - ord('a')
+
+Crib = tuple[tuple[int, int, int, int], ...]
+
+def _crib_hypotheses(cipher: np.ndarray, crib: str, alphabet: str, top: int = 3) -> list[Crib]:
+    # a frequent crib shows up as a frequent run of ciphertext digraphs, once for each alignment
+    crib = crib.lower()
+    if 'j' not in alphabet: crib = crib.replace('j', 'i')
+    codes: list[int] = [ord(c) - ord('a') for c in crib if c in alphabet]
+    digraphs: list[int] = (cipher[0::2] * 26 + cipher[1::2]).tolist()
+
+    alignments: list[list[Crib]] = []
+    for offset in (0, 1):
+        pairs: list[tuple[int, int]] = [(codes[i], codes[i+1]) for i in range(offset, len(codes) - 1, 2)]
+        if len(pairs) <= 0 or any(a == b for a, b in pairs): continue
+        runs: Counter[tuple[int, ...]] = Counter(tuple(digraphs[i:i+len(pairs)]) for i in range(len(digraphs) - len(pairs) + 1))
+        alignments.append([
+            tuple((a, b, digraph // 26, digraph % 26) for (a, b), digraph in zip(pairs, run))
+            for run, count in runs.most_common(top) if count > 1
+        ])
+
+    hypotheses: list[Crib] = []
+    if len(alignments) == 2:
+        hypotheses += [even + odd for even in alignments[0] for odd in alignments[1] if even[0][2:] != odd[0][2:]]
+    for candidates in alignments: hypotheses += candidates
+    return hypotheses
+
+def _place_crib(crib: Crib, rng: random.Random, limit: int = 20000) -> list[int] | None:
+    # backtracking over the cells of the crib letters, the decryption of placed pairs forces the rest
+    grid: list[int] = [-1] * 25
+    cells: list[int] = [-1] * 26
+    trail: list[int] = []
+    nodes: int = 0
+
+    def place(letter: int, cell: int) -> bool:
+        if cells[letter] == cell: return True
+        if cells[letter] >= 0 or grid[cell] >= 0: return False
+        cells[letter] = cell
+        grid[cell] = letter
+        trail.append(letter)
+        return True
+
+    def undo(length: int) -> None:
+        while len(trail) > length:
+            letter: int = trail.pop()
+            grid[cells[letter]] = -1
+            cells[letter] = -1
+
+    def force(first: int, second: int, key: int, table_first: np.ndarray, table_second: np.ndarray) -> int:
+        # 1 when a letter was placed, 0 when nothing changed, -1 on a contradiction
+        placed: int = 0
+        for letter, cell in ((first, int(table_first[key])), (second, int(table_second[key]))):
+            if grid[cell] == letter: continue
+            if not place(letter, cell): return -1
+            placed = 1
+        return placed
+
+    def propagate() -> bool:
+        # placed ciphertext letters fix where the plaintext letters are and the other way around
+        changed: bool = True
+        while changed:
+            changed = False
+            for plain_a, plain_b, cipher_a, cipher_b in crib:
+                for a, b, c, d, table_first, table_second in (
+                    (cipher_a, cipher_b, plain_a, plain_b, _DECRYPT_FIRST, _DECRYPT_SECOND),
+                    (plain_a, plain_b, cipher_a, cipher_b, _ENCRYPT_FIRST, _ENCRYPT_SECOND),
+                ):
+                    if cells[a] < 0 or cells[b] < 0: continue
+                    if cells[a] == cells[b]: return False
+                    result: int = force(c, d, cells[a] * 25 + cells[b], table_first, table_second)
+                    if result < 0: return False
+                    changed = changed or result > 0
+        return True
+
+    letters: list[int] = sorted({c for constraint in crib for c in constraint})
+
+    def next_letter() -> int:
+        # letters that complete a pair propagate the most
+        counts: Counter[int] = Counter()
+        for constraint in crib:
+            for a, b in (constraint[:2], constraint[2:]):
+                if (cells[a] < 0) != (cells[b] < 0): counts[a if cells[a] < 0 else b] += 1
+        if len(counts) > 0: return counts.most_common(1)[0][0]
+        return next((letter for letter in letters if cells[letter] < 0), -1)
+
+    def search() -> bool:
+        nonlocal nodes
+        nodes += 1
+        if nodes > limit: return False
+        letter: int = next_letter()
+        if letter < 0: return True
+        free: list[int] = [cell for cell in range(25) if grid[cell] < 0]
+        rng.shuffle(free)
+        for cell in free:
+            length: int = len(trail)
+            if place(letter, cell) and propagate() and search(): return True
+            undo(length)
+        return False
+
+    # the key repeats under row and column rotations, so the first letter can go anywhere
+    if not (place(letters[0], rng.randrange(25)) and propagate() and search()): return None
+    return grid
+
+def _start_grid(letters: list[int], rng: random.Random, crib: Crib | None) -> np.ndarray:
+    grid: list[int] | None = _place_crib(crib, rng) if crib is not None else None
+    if grid is None: return np.array(rng.sample(letters, 25), dtype=np.intp)
+
+    rest: list[int] = [letter for letter in letters if letter not in grid]
+    rng.shuffle(rest)
+    return np.array([letter if letter >= 0 else rest.pop() for letter in grid], dtype=np.intp)
+
+def _anneal(cipher: np.ndarray, table: np.ndarray, alphabet: str, seed: int, crib: Crib | None,
+            temperature: float, cooling: float, steps: int) -> tuple[str, float, int]:
+    rng: random.Random = random.Random(seed)
+    letters: list[int] = [ord(c) - ord('a') for c in alphabet]
+    annealer: _Annealer = _Annealer(cipher, table, _start_grid(letters, rng, crib))
+    iterations: int = 0
+
+    if crib is not None:
+        # the crib usually fits several placements, the right one climbs to the solution within a few thousand moves
+        for _ in range(CRIB_PROBES):
+            probe: _Annealer = _Annealer(cipher, table, _start_grid(letters, rng, crib))
+            probe.run(rng, CRIB_TEMPERATURE, CRIB_STEPS)
+            if probe.best_score > annealer.best_score: annealer = probe
+            iterations += CRIB_STEPS
+        annealer = _Annealer(cipher, table, annealer.best_grid)
+
+    while temperature > 0:
+        annealer.run(rng, temperature, steps)
+        iterations += steps
+        temperature -= cooling
+
+    return ''.join(chr(c + ord('a')) for c in annealer.best_grid), annealer.best_score, iterations
+
+_solver_table: np.ndarray | None = None
+
+def _init_solver(table: np.ndarray) -> None:
+    global _solver_table
+    _solver_table = table
+
+def _solve_restart(cipher: np.ndarray, alphabet: str, seed: int, crib: Crib | None,
+                   temperature: float, cooling: float, steps: int) -> tuple[str, float, int]:
+    table: np.ndarray = _solver_table if _solver_table is not None else _default_quadgram_table()
+    return _anneal(cipher, table, alphabet, seed, crib, temperature, cooling, steps)
+
+def solve(input_text: str, alphabet: str, restarts: int = 8, processes: int | None = None,
+          temperature: float = 10.0, cooling: float = 0.2, steps: int = 4000,
+          crib: str | None = SPACE_CRIB, quadgrams: Mapping[str, int] | None = None, seed: int | None = None,
+          progress: Callable[[SolverProgress], None] | None = None) -> SolverResult:
+    # simulated annealing, the independent restarts run on a process pool
+    cipher: np.ndarray = _cipher_codes(input_text, alphabet)
+    table: np.ndarray = _default_quadgram_table() if quadgrams is None else quadgram_table(quadgrams)
+    # restarts take turns on the crib placements, random keys when the crib does not fit
+    hypotheses: list[Crib | None] = []
+    if crib is not None:
+        hypotheses += [h for h in _crib_hypotheses(cipher, crib, alphabet) if _place_crib(h, random.Random(0)) is not None]
+        # the runs that fit both alignments at once pin the most letters
+        if len(hypotheses) > 0: hypotheses = [h for h in hypotheses if len(h) == len(hypotheses[0])]
+    if len(hypotheses) <= 0: hypotheses = [None]
+    rng: random.Random = random.Random(seed)
+    seeds: list[int] = [rng.getrandbits(64) for _ in range(restarts)]
+    if processes is None: processes = os.cpu_count() or 1
+
+    best_key: str = ''
+    best_score: float = -math.inf
+    time_to_solution: float = 0.0
+    iterations: int = 0
+    restart_scores: list[float] = []
+    start: float = time.perf_counter()
+
+    def finish(key: str, score: float, restart_iterations: int) -> None:
+        nonlocal best_key, best_score, time_to_solution, iterations
+        elapsed: float = time.perf_counter() - start
+        iterations += restart_iterations
+        restart_scores.append(score)
+        if score > best_score: best_key, best_score, time_to_solution = key, score, elapsed
+        if progress is not None: progress(SolverProgress(len(restart_scores), restarts, score, best_score, elapsed))
+
+    tasks: list[tuple[Any, ...]] = [
+        (cipher, alphabet, restart_seed, hypotheses[i % len(hypotheses)], temperature, cooling, steps)
+        for i, restart_seed in enumerate(seeds)
+    ]
+    if processes <= 1 or restarts <= 1:
+        for task in tasks: finish(*_anneal(cipher, table, *task[1:]))
+    else:
+        with ProcessPoolExecutor(min(processes, restarts), initializer=_init_solver, initargs=(table,)) as executor:
+            for future in as_completed([executor.submit(_solve_restart, *task) for task in tasks]): finish(*future.result())
 
-    return ''.join(decrypted_text)
+    plaintext: str = decrypt((cipher + ord('a')).astype(np.uint8).tobytes().decode("ascii"), best_key, alphabet)
+    return SolverResult(best_key, plaintext, best_score, restarts, iterations, time.perf_counter() - start, time_to_solution, restart_scores)
 
-class App(qtw.QMainWindow):
+# the gui is optional, the cipher functions also work headless
+class App(qtw.QMainWindow if qtw is not None else object):
     def __init__(self) -> None:
         super().__init__()
         self.setWindowTitle("playfair")
@@ -122,7 +594,7 @@ class App(qtw.QMainWindow):
         self.key_text: qtw.QLineEdit = qtw.QLineEdit()
         self.main_layout.addWidget(self.key_text)
 
-        self.matrix_size: int = 5
+        self.matrix_size: int = matrix_size(config["alphabet"])
         self.cell_size: int = 30
 
         self.key_matrix_table: qtw.QTableWidget = qtw.QTableWidget(self.matrix_size, self.matrix_size)
@@ -187,7 +659,7 @@ class App(qtw.QMainWindow):
         )
         self.output_text.setText(encrypted_text.upper())
 
-        formatted_input: str = format_text(self.input_text.toPlainText()).upper()
+        formatted_input: str = format_text(self.input_text.toPlainText(), config["alphabet"]).upper()
         formatted_input = tf.groups_of(formatted_input, 2)
         self.formatted_input_text.setText(formatted_input)
 
@@ -213,7 +685,7 @@ class App(qtw.QMainWindow):
                 self.key_matrix_table.setItem(i, j, item)
 
 
-    def clear_layout(self, layout: qtw.QLayout | None) -> None: 
+    def clear_layout(self, layout: 'qtw.QLayout | None') -> None: 
         if layout is None: return
         while layout.count():
             item = layout.takeAt(0)
@@ -0,0 +1,62 @@
+from typing import Callable, Mapping
+from collections import Counter
+import text_formatter as tf
+import numpy as np
+import glob
+import math
+import re
+import os
+
+# the training corpus is 879 kB of english, the license texts of debian 12 base-files (12.4+deb12u12) and the
+# vim 9.0 user manual of vim-runtime (2:9.0.1378-2+deb12u2). the license texts allow verbatim copies and the manual
+# is under the vim license (:help license). the tables only store counts, none of the text
+CORPUS_LICENSES: list[str] = (
+    "Apache-2.0 Artistic BSD CC0-1.0 GFDL-1.2 GFDL-1.3 GPL-1 GPL-2 GPL-3 LGPL-2 LGPL-2.1 LGPL-3 MPL-1.1 MPL-2.0"
+).split(' ')
+CORPUS_MANUAL: str = "/usr/share/vim/vim90/doc/usr_*.txt"
+# pseudo count of quadgrams missing from a table
+QUADGRAM_FLOOR: float = 0.01
+# quadgrams of char_map formatted text, the plaintext format of adfgx and adfgvx, python src/quadgrams.py rebuilds it
+CHAR_MAP_PATH: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "quadgrams_char_map.txt")
+
+def main() -> None:
+    save_quadgrams(train_quadgrams(training_corpus(), tf.get_codec("char_map").normalize), CHAR_MAP_PATH, min_count=3)
+
+def training_corpus() -> str:
+    paths: list[str] = [f"/usr/share/common-licenses/{name}" for name in CORPUS_LICENSES] + sorted(glob.glob(CORPUS_MANUAL))
+    text: str = ''.join(open(path, "r", encoding="utf-8").read() for path in paths)
+    return re.sub(r'[^A-Za-z0-9 .,\n]+', ' ', text)
+
+def count_quadgrams(formatted_text: str) -> dict[str, int]:
+    return dict(Counter(map(''.join, zip(formatted_text, formatted_text[1:], formatted_text[2:], formatted_text[3:]))))
+
+def train_quadgrams(input_text: str, format_text: Callable[[str], str]) -> dict[str, int]:
+    # counted on formatted text, so whatever the cipher spells out scores like real plaintext
+    return count_quadgrams(format_text(input_text))
+
+def load_quadgrams(path: str) -> dict[str, int]:
+    counts: dict[str, int] = {}
+    with open(path, "r") as file:
+        for line in file:
+            quadgram, count = line.split()
+            counts[quadgram] = int(count)
+    return counts
+
+def save_quadgrams(counts: Mapping[str, int], path: str, min_count: int = 1) -> None:
+    with open(path, "w") as file:
+        for quadgram, count in sorted(counts.items(), key = lambda x: (-x[1], x[0])):
+            if count >= min_count: file.write(f"{quadgram} {count}\n")
+
+def quadgram_table(counts: Mapping[str, int], symbols: int = 26) -> np.ndarray:
+    # log10 probability of every quadgram of a-z, indexed by its base symbols value,
+    # codes past z stand for other chars and score like a missing quadgram
+    total: float = sum(counts.values())
+    table: np.ndarray = np.full(symbols ** 4, math.log10(QUADGRAM_FLOOR / total))
+    for quadgram, count in counts.items():
+        if len(quadgram) != 4 or not all('a' <= c <= 'z' for c in quadgram): continue
+        index: int = 0
+        for c in quadgram: index = index * symbols + ord(c) - ord('a')
+        table[index] = math.log10(count / total)
+    return table
+
+if __name__ == "__main__": main()
@@ -1,15 +1,33 @@
-from PySide6 import QtWidgets as qtw
+try: from PySide6 import QtWidgets as qtw, QtCore as qtc
+except ImportError: qtw = qtc = None
 import text_formatter as tf
+from concurrent.futures import CancelledError, Future, ProcessPoolExecutor, ThreadPoolExecutor, FIRST_COMPLETED, wait
+from multiprocessing.synchronize import Event
+from typing import Callable, Iterator, NamedTuple
+from bisect import bisect_left
 from math import gcd
+import multiprocessing
+import threading
 import random
+import time
 import sys
+import os
 
 BIT_LENGTH = 512
 BLOCK_SIZE = 4
 ASCII_BITS = 8
+# packed fills every block up to the modulus, legacy is the old BLOCK_SIZE chars per block
+BLOCK_MODES = ("packed", "legacy")
+# candidates are trial divided by every prime below this before miller rabin
+SIEVE_LIMIT = 1 << 16
+# odd candidates sieved at once, a few prime gaps at 4096 bits
+SIEVE_WINDOW = 1 << 13
+# how often the parallel keygen looks at its cancel event and timeout, in seconds
+KEYGEN_POLL = 0.1
 
 def main():
     if len(sys.argv) == 1:
+        if qtw is None: sys.exit("PySide6 is required for the gui")
         app = qtw.QApplication(sys.argv)
 
         stylesheet_path = "../stylesheet"
@@ -57,59 +75,265 @@ def is_prime(n, k = 50):
 
     return True
 
-def generate_large_prime(bit_length: int) -> int:
+def _small_primes(limit: int) -> tuple[int, ...]:
+    sieve = bytearray([1]) * limit
+    sieve[:2] = b"\x00\x00"
+    for i in range(2, int(limit ** 0.5) + 1):
+        if sieve[i]: sieve[i*i::i] = bytes(len(range(i*i, limit, i)))
+    return tuple(i for i in range(3, limit) if sieve[i])
+
+# odd primes only, candidates are odd already
+SMALL_PRIMES = _small_primes(SIEVE_LIMIT)
+
+def miller_rabin_rounds(bit_length: int) -> int:
+    # rounds that keep the error on random candidates below 2^-80, handbook of applied cryptography table 4.4
+    for bits, rounds in ((1300, 2), (850, 3), (650, 4), (550, 5), (450, 6), (400, 7), (350, 8), (300, 9), (250, 12), (200, 15), (150, 18)):
+        if bit_length >= bits: return rounds
+    return 27
+
+def _composite_witness(a: int, d: int, s: int, n: int) -> bool:
+    x = pow(a, d, n)
+    if x == 1 or x == n - 1: return False
+    for _ in range(s - 1):
+        x = x * x % n
+        if x == n - 1: return False
+    return True
+
+class PrimeSearch(NamedTuple):
+    prime: int
+    # odd numbers looked at, the ones the sieve threw out, the ones miller rabin saw and its rounds in total
+    candidates: int
+    sieved: int
+    tested: int
+    rounds: int
+    seconds: float
+
+def find_prime(bit_length: int, rounds: int | None = None, stop: Callable[[], bool] | None = None) -> PrimeSearch:
+    # random start with the top two bits set, so a product of two has exactly twice the bits, then odd numbers upwards,
+    # stop is asked before every sieve window and miller rabin test and cancels the search
+    if bit_length < 3: raise ValueError("primes with the top two bits set need at least 3 bits")
+    if rounds is None: rounds = miller_rabin_rounds(bit_length)
+    start_time = time.perf_counter()
+    lowest = 3 << (bit_length - 2)
+    # primes below every candidate, so a zero remainder always means composite
+    primes = SMALL_PRIMES[:bisect_left(SMALL_PRIMES, lowest)]
+    candidates = sieved = tested = rounds_run = 0
+
     while True:
-        prime_candidate = random.getrandbits(bit_length)
-        if is_prime(prime_candidate): return prime_candidate
+        start = random.getrandbits(bit_length) | lowest | 1
+        while start.bit_length() == bit_length:
+            if stop is not None and stop(): raise CancelledError("the prime search was stopped")
+            # window[k] stands for start + 2k, the sieve zeroes every k divisible by a small prime
+            window = bytearray([1]) * SIEVE_WINDOW
+            for prime in primes:
+                first = (prime - start % prime) * ((prime + 1) // 2) % prime
+                if first < SIEVE_WINDOW: window[first::prime] = bytes(len(range(first, SIEVE_WINDOW, prime)))
 
-def generate_keys(bit_length: int = 4096) -> tuple[tuple[int, int], tuple[int, int]]:
-    p = generate_large_prime(bit_length)
-    q = generate_large_prime(bit_length)
+            for k in range(SIEVE_WINDOW):
+                candidate = start + 2 * k
+                if candidate.bit_length() != bit_length: break
+                candidates += 1
+                if not window[k]:
+                    sieved += 1
+                    continue
+
+                if stop is not None and stop(): raise CancelledError("the prime search was stopped")
+                tested += 1
+                d, s = candidate - 1, 0
+                while d % 2 == 0: d, s = d // 2, s + 1
+                for _ in range(rounds):
+                    rounds_run += 1
+                    if _composite_witness(random.randint(2, candidate - 2), d, s, candidate): break
+                else:
+                    return PrimeSearch(candidate, candidates, sieved, tested, rounds_run, time.perf_counter() - start_time)
+
+            start += 2 * SIEVE_WINDOW
+
+def generate_large_prime(bit_length: int) -> int:
+    return find_prime(bit_length).prime
+
+class PrivateKey:
+    # unpacks, indexes and compares like the (n, d) tuple, p and q let exponentiation go through the chinese remainder theorem
+    __slots__ = ("n", "d", "p", "q", "dp", "dq", "qinv")
+
+    def __init__(self, n: int, d: int, p: int, q: int) -> None:
+        if p * q != n: raise ValueError("the primes of an rsa private key have to multiply to its modulus")
+        if p == q: raise ValueError("the primes of an rsa private key have to be distinct")
+        self.n: int = n
+        self.d: int = d
+        self.p: int = p
+        self.q: int = q
+        self.dp: int = d % (p - 1)
+        self.dq: int = d % (q - 1)
+        self.qinv: int = pow(q, -1, p)
+
+    def power(self, block: int) -> int:
+        # pow(block, d, n) from two half size exponentiations, garner recombination
+        m1 = pow(block, self.dp, self.p)
+        m2 = pow(block, self.dq, self.q)
+        return m2 + self.qinv * (m1 - m2) % self.p * self.q
+
+    def __iter__(self) -> Iterator[int]: return iter((self.n, self.d))
+    def __len__(self) -> int: return 2
+    def __getitem__(self, index: int) -> int: return (self.n, self.d)[index]
+    def __eq__(self, other: object) -> bool: return tuple(self) == (tuple(other) if isinstance(other, PrivateKey) else other)
+    def __hash__(self) -> int: return hash((self.n, self.d))
+    # the tuple form is what the gui shows and the dsa key files store
+    def __str__(self) -> str: return str((self.n, self.d))
+    def __repr__(self) -> str: return f"PrivateKey(n={self.n}, d={self.d}, p={self.p}, q={self.q})"
+
+Key = tuple[int, int] | PrivateKey
+Buffer = bytes | bytearray | memoryview
+
+def _power(key: Key) -> Callable[[int], int]:
+    if isinstance(key, PrivateKey): return key.power
+    n, exponent = key
+    return lambda block: pow(block, exponent, n)
+
+def keys_from_primes(p: int, q: int) -> tuple[tuple[int, int], PrivateKey]:
     n = p * q
     phi = (p - 1) * (q - 1)
     e = random.randint(2, phi - 1)
     while gcd(e, phi) != 1:
         e = random.randint(2, phi - 1)
     d = pow(e, -1, phi)
-    return (n, e), (n, d)
+    return (n, e), PrivateKey(n, d, p, q)
+
+def generate_keys(bit_length: int = 4096) -> tuple[tuple[int, int], PrivateKey]:
+    p = generate_large_prime(bit_length)
+    q = generate_large_prime(bit_length)
+    # short bit lengths draw the same prime twice every so often
+    while q == p: q = generate_large_prime(bit_length)
+    return keys_from_primes(p, q)
+
+# parallel keygen, every worker searches from its own random start and the first two distinct primes win
+
+_keygen_stop: Event | None = None
+
+def _init_keygen_worker(stop: Event) -> None:
+    global _keygen_stop
+    _keygen_stop = stop
+
+def _keygen_task(bit_length: int, seed: int) -> int:
+    # every task gets its own seed, so no two searches start from the same random state
+    assert _keygen_stop is not None
+    random.seed(seed)
+    return find_prime(bit_length, stop=_keygen_stop.is_set).prime
+
+def generate_keys_parallel(bit_length: int = 4096, processes: int | None = None, timeout: float | None = None,
+                           cancel: threading.Event | None = None) -> tuple[tuple[int, int], PrivateKey]:
+    # raises TimeoutError after timeout seconds and CancelledError once cancel is set, processes None uses every core
+    if processes is None: processes = os.cpu_count() or 1
+    deadline = None if timeout is None else time.monotonic() + timeout
+
+    def expired() -> bool:
+        if cancel is not None and cancel.is_set(): raise CancelledError("rsa key generation was cancelled")
+        if deadline is not None and time.monotonic() >= deadline: raise TimeoutError(f"rsa key generation took longer than {timeout} s")
+        return False
+
+    primes: list[int] = []
+    if processes <= 1:
+        while len(primes) < 2:
+            prime = find_prime(bit_length, stop=expired).prime
+            if prime not in primes: primes.append(prime)
+        return keys_from_primes(*primes)
+
+    # spawned and not forked, the gui calls this from a worker thread and forking a threaded qt process
+    # can copy locks held by other threads into the children
+    context = multiprocessing.get_context("spawn")
+    stop = context.Event()
+    with ProcessPoolExecutor(processes, mp_context=context, initializer=_init_keygen_worker, initargs=(stop,)) as executor:
+        try:
+            pending: set[Future[int]] = {executor.submit(_keygen_task, bit_length, random.getrandbits(64)) for _ in range(processes)}
+            while len(primes) < 2:
+                expired()
+                done, pending = wait(pending, KEYGEN_POLL, FIRST_COMPLETED)
+                for future in done:
+                    prime = future.result()
+                    if prime not in primes and len(primes) < 2: primes.append(prime)
+                    # the worker that found it goes after the other prime
+                    if len(primes) < 2: pending.add(executor.submit(_keygen_task, bit_length, random.getrandbits(64)))
+        finally:
+            # running searches see the event within one miller rabin test and the pool can shut down
+            stop.set()
+
+    return keys_from_primes(*primes)
 
+# legacy blocks, one byte per char, so only chars up to 255 fit
 def text_to_numeric(text: str) -> int:
-    binary = ''.join(
-        format(ord(char), f'0{ASCII_BITS}b')
-        for char in text
-    )
-    return int(binary, 2)
+    return int.from_bytes(text.encode("latin-1"), "big")
 
 def numeric_to_text(number: int) -> str:
-    binary = format(number, 'b')
-    padded_binary = binary.zfill(
-        (len(binary) + ASCII_BITS - 1) // ASCII_BITS * ASCII_BITS
-    )
-    chars = [
-        chr(int(padded_binary[i:i+ASCII_BITS], 2))
-        for i in range(0, len(padded_binary), ASCII_BITS)
-    ]
-    return ''.join(chars)
+    length = max(1, (number.bit_length() + ASCII_BITS - 1) // ASCII_BITS)
+    return number.to_bytes(length, "big").decode("latin-1")
+
+def packed_block_size(n: int) -> int:
+    # data bytes per block, a 0x01 byte in front keeps leading zeros and the length of the last block and stays below n
+    size = (n.bit_length() - 1) // 8 - 1
+    if size <= 0: raise ValueError(f"a {n.bit_length()} bit modulus is too small for packed blocks")
+    return size
+
+def pack_blocks(data: Buffer, n: int) -> list[int]:
+    size = packed_block_size(n)
+    # a flat byte view, so slicing does not copy and any buffer format counts in bytes
+    view = memoryview(data)
+    # cast only takes c contiguous views, a strided one is copied first
+    data = (view if view.c_contiguous else memoryview(view.tobytes())).cast("B")
+    blocks = []
+    for i in range(0, len(data), size):
+        chunk = data[i:i+size]
+        blocks.append(int.from_bytes(chunk, "big") | 1 << 8 * len(chunk))
+    return blocks
+
+def unpack_blocks(blocks: list[int]) -> bytes:
+    chunks = []
+    for block in blocks:
+        # a zero block has no marker byte and would give a negative length
+        if block <= 0: raise ValueError("not a packed rsa block, wrong key or block mode")
+        length = (block.bit_length() - 1) // 8
+        if block >> 8 * length != 1: raise ValueError("not a packed rsa block, wrong key or block mode")
+        chunks.append((block ^ 1 << 8 * length).to_bytes(length, "big"))
+    return b''.join(chunks)
 
-def encrypt(message: str, public_key: tuple[int, int]) -> list[int]:
-    n, e = public_key
+# either key works in both directions, signing encrypts with the private key and goes through crt like decryption
+def encrypt_bytes(data: Buffer, public_key: Key) -> list[int]:
+    power = _power(public_key)
+    return [power(block) for block in pack_blocks(data, public_key[0])]
+
+def decrypt_bytes(ciphertext: list[int], private_key: Key) -> bytes:
+    power = _power(private_key)
+    return unpack_blocks([power(block) for block in ciphertext])
+
+def encrypt(message: str, public_key: Key, mode: str = "packed") -> list[int]:
+    if mode == "packed": return encrypt_bytes(message.encode("utf-8"), public_key)
+    if mode != "legacy": raise ValueError(f"unknown rsa block mode {mode!r}, expected one of {BLOCK_MODES}")
+    power = _power(public_key)
     blocks = [
         text_to_numeric(message[i:i+BLOCK_SIZE])
         for i in range(0, len(message), BLOCK_SIZE)
     ]
-    return [pow(block, e, n) for block in blocks]
+    return [power(block) for block in blocks]
 
-def decrypt(ciphertext: list[int], private_key: tuple[int, int]) -> str:
-    n, d = private_key
+def decrypt(ciphertext: list[int], private_key: Key, mode: str = "packed") -> str:
+    if mode == "packed": return decrypt_bytes(ciphertext, private_key).decode("utf-8")
+    if mode != "legacy": raise ValueError(f"unknown rsa block mode {mode!r}, expected one of {BLOCK_MODES}")
+    power = _power(private_key)
     blocks = [
-        pow(block, d, n)
+        power(block)
         for block in ciphertext
     ]
     return ''.join(numeric_to_text(block) for block in blocks)
 
-class App(qtw.QMainWindow):
+# the gui is optional, the cipher functions also work headless
+class App(qtw.QMainWindow if qtw is not None else object):
+    # keygen runs on a thread of its own and hands its future back to the gui thread through this signal
+    keys_generated = qtc.Signal(object) if qtc is not None else None
+
     def __init__(self):
         super().__init__()
+        self.keygen_executor = ThreadPoolExecutor(1)
+        self.keygen_cancel = threading.Event()
+        self.keys_generated.connect(self.show_keys)
         self.setWindowTitle("rsa")
         self.central_widget = qtw.QWidget()
         self.setCentralWidget(self.central_widget)
@@ -168,17 +392,34 @@ class App(qtw.QMainWindow):
         try:
             text = eval(self.output_text.toPlainText())
             private_key = eval(self.private_key_field.text())
+            # the field only shows (n, d), the generated key is the same one with its primes
+            if private_key == getattr(self, "private_key", None): private_key = self.private_key
             decrypted = decrypt(text, private_key)
             self.output_text.setText(decrypted)
         except Exception as e:
             self.output_text.setText(f"error: {e}")
 
     def generate_keys(self):
+        self.generate_keys_button.setEnabled(False)
+        self.output_text.setText("generating keys")
+        future = self.keygen_executor.submit(generate_keys_parallel, BIT_LENGTH, cancel=self.keygen_cancel)
+        future.add_done_callback(self.keys_generated.emit)
+
+    def show_keys(self, future):
+        self.generate_keys_button.setEnabled(True)
         try:
-            self.public_key, self.private_key = generate_keys(BIT_LENGTH)
+            self.public_key, self.private_key = future.result()
             self.public_key_field.setText(str(self.public_key))
             self.private_key_field.setText(str(self.private_key))
+            self.output_text.clear()
+        except CancelledError:
+            pass
         except Exception as e:
             self.output_text.setText(f"error: {e}")
 
+    def closeEvent(self, event):
+        self.keygen_cancel.set()
+        self.keygen_executor.shutdown(wait=False)
+        super().closeEvent(event)
+
 if __name__ == "__main__": main()
@@ -1,10 +1,13 @@
 import text_formatter as tf
 from PIL import Image as pimg
-from PySide6 import ( 
-    QtWidgets as qtw,
-    QtCore as qtc,
-    QtGui as qtg
-)
+try:
+    from PySide6 import ( 
+        QtWidgets as qtw,
+        QtCore as qtc,
+        QtGui as qtg
+    )
+except ImportError:
+    qtw = qtc = qtg = None
 import sys
 import os
 
@@ -117,7 +120,8 @@ def extract_message(image_path: str) -> str:
     binary_message = binary_message[32:]
     return binary_to_text(binary_message)
 
-class App(qtw.QMainWindow):
+# the gui is optional, the cipher functions also work headless
+class App(qtw.QMainWindow if qtw is not None else object):
     def __init__(self):
         super().__init__()
         self.setWindowTitle("steganography")
@@ -275,6 +279,7 @@ class App(qtw.QMainWindow):
 
 def main():
     if len(sys.argv) == 1:
+        if qtw is None: sys.exit("PySide6 is required for the gui")
         app = qtw.QApplication(sys.argv)
         stylesheet_path = "../stylesheet"
         try: 
@@ -1,5 +1,25 @@
+from typing import BinaryIO, Callable, Iterable, Iterator, Mapping, NamedTuple, TextIO
+from types import MappingProxyType
+from contextlib import ExitStack
+from functools import lru_cache
 import unicodedata
+import operator
+import codecs
+import re
 import sys
+import os
+
+DEFAULT_BLACK_LIST: tuple[str, ...] = ('\n', '\t', '\r')
+CHUNK_SIZE: int = 1 << 20
+
+_spaces = re.compile(r'\s+')
+_repeated_spaces = re.compile(r'(\s)\s+')
+_repeated_chars = re.compile(r'([^x])(?=\1)', re.DOTALL)
+_repeated_xs = re.compile(r'x(?=x)')
+_ascii_lower: bytes = bytes.maketrans(
+    bytes(range(ord('A'), ord('Z') + 1)),
+    bytes(range(ord('a'), ord('z') + 1))
+)
 
 def main() -> None: 
     if len(sys.argv) == 1: return
@@ -7,52 +27,217 @@ def main() -> None:
         case "-x" | "-x": print('x')
         case _: print("unknown argument")
 
+def _ranges(flags: bytes) -> list[tuple[int, int]]:
+    return [(m.start(), m.end() - 1) for m in re.finditer(b'\x01+', flags)]
+
+@lru_cache(maxsize=1)
+def _all_chars() -> str:
+    return ''.join(map(chr, range(sys.maxunicode + 1)))
+
+@lru_cache(maxsize=1)
+def _kept_ranges() -> list[tuple[int, int]]:
+    chars: str = _all_chars()
+    return _ranges(bytes(map(operator.or_, map(str.isalnum, chars), map(str.isspace, chars))))
+
+@lru_cache(maxsize=1)
+def _nonspacing_mark_ranges() -> list[tuple[int, int]]:
+    return _ranges(bytes(map('Mn'.__eq__, map(unicodedata.category, _all_chars()))))
+
+def _subtract(ranges: Iterable[tuple[int, int]], code_points: Iterable[int]) -> list[tuple[int, int]]:
+    result: list[tuple[int, int]] = list(ranges)
+    for code_point in sorted(set(code_points)):
+        for i, (start, end) in enumerate(result):
+            if not start <= code_point <= end: continue
+            result[i:i+1] = [r for r in ((start, code_point - 1), (code_point + 1, end)) if r[0] <= r[1]]
+            break
+    return result
+
+def _complement(ranges: Iterable[tuple[int, int]]) -> list[tuple[int, int]]:
+    result: list[tuple[int, int]] = []
+    next_start: int = 0
+    for start, end in ranges:
+        if start > next_start: result.append((next_start, start - 1))
+        next_start = end + 1
+    if next_start <= sys.maxunicode: result.append((next_start, sys.maxunicode))
+    return result
+
+_astral_chars = re.compile('[^\x00-\uffff]')
+
+class _CharClass:
+    # sre only builds an O(1) charset for the bmp, astral ranges are scanned linearly so they get their own pass
+    __slots__ = ("bmp", "astral")
+
+    def __init__(self, ranges: Iterable[tuple[int, int]]) -> None:
+        ranges = list(ranges)
+        bmp: list[tuple[int, int]] = [(start, min(end, 0xFFFF)) for start, end in ranges if start <= 0xFFFF]
+        astral: list[tuple[int, int]] = [(max(start, 0x10000), end) for start, end in ranges if end > 0xFFFF]
+        self.bmp: re.Pattern[str] | None = _char_class_pattern(bmp) if len(bmp) > 0 else None
+        self.astral: re.Pattern[str] | None = _char_class_pattern(astral) if len(astral) > 0 else None
+
+    def delete(self, input_text: str) -> str:
+        if self.bmp is not None: input_text = self.bmp.sub('', input_text)
+        if self.astral is not None and _astral_chars.search(input_text) is not None:
+            input_text = self.astral.sub('', input_text)
+        return input_text
+
+def _char_class_pattern(ranges: list[tuple[int, int]]) -> re.Pattern[str]:
+    return re.compile('[' + ''.join(
+        re.escape(chr(start)) if start == end
+        else f'{re.escape(chr(start))}-{re.escape(chr(end))}'
+        for start, end in ranges
+    ) + ']+')
+
+@lru_cache(maxsize=1)
+def _nonspacing_marks() -> _CharClass:
+    return _CharClass(_nonspacing_mark_ranges())
+
+def _strip_marks(input_text: str) -> str:
+    if input_text.isascii(): return input_text
+    return _nonspacing_marks().delete(unicodedata.normalize('NFD', input_text))
+
+class Normalizer:
+    __slots__ = ("black_list", "char_map", "_matcher", "_ascii_delete", "_deleted_chars")
+
+    def __init__(self, black_list: list[str] | None = None, char_map: dict[str, str] | None = None) -> None:
+        if black_list is None: black_list = list(DEFAULT_BLACK_LIST)
+        self.black_list: frozenset[str] = frozenset(black_list)
+        self.char_map: dict[str, str] | None = dict(char_map) if char_map is not None else None
+        self._matcher: CharMapMatcher | None = None
+        if self.char_map is not None: self._matcher = compile_char_map_matcher(self.char_map)
+
+        self._ascii_delete: bytes = bytes(
+            i for i in range(128)
+            if chr(i) in self.black_list or not (chr(i).isalnum() or chr(i).isspace())
+        )
+        self._deleted_chars: _CharClass | None = None
+
+    def _filter(self, input_text: str) -> str:
+        if input_text.isascii():
+            return input_text.encode('ascii').translate(_ascii_lower, self._ascii_delete).decode('ascii')
+
+        if self._deleted_chars is None:
+            kept: list[tuple[int, int]] = _subtract(
+                _kept_ranges(),
+                (ord(c) for c in self.black_list if len(c) == 1)
+            )
+            self._deleted_chars = _CharClass(_complement(kept))
+
+        # str.lower applies the final sigma rule, lowering char by char does not
+        return self._deleted_chars.delete(input_text).replace('\u03a3', '\u03c3').lower()
+
+    def __call__(self, input_text: str) -> str:
+        if len(input_text) <= 0: return input_text
+
+        normalized_text: str = self._filter(input_text.strip())
+        normalized_text = _repeated_spaces.sub(r'\1', normalized_text)
+        if self._matcher is not None:
+            normalized_text = self._matcher.replace(normalized_text)
+
+        return _strip_marks(normalized_text)
+
+    def stream(self, chunks: Iterable[str]) -> Iterator[str]:
+        normalized_chunks: Iterator[str] = self._filter_chunks(chunks)
+        if self._matcher is not None:
+            normalized_chunks = self._matcher.replace_chunks(normalized_chunks)
+        return _strip_marks_chunks(normalized_chunks)
+
+    def _filter_chunks(self, chunks: Iterable[str]) -> Iterator[str]:
+        started: bool = False
+        last_is_space: bool = False
+        # trailing whitespace is only emitted once more text follows, the end of the stream strips it
+        pending_space: str = ''
+
+        for chunk in chunks:
+            if not started:
+                chunk = chunk.lstrip()
+                if len(chunk) <= 0: continue
+                started = True
+
+            body: str = chunk.rstrip()
+            if len(body) > 0:
+                filtered_text: str = _repeated_spaces.sub(r'\1', pending_space + self._filter(body))
+                if last_is_space: filtered_text = filtered_text.lstrip()
+                if len(filtered_text) > 0:
+                    last_is_space = filtered_text[-1].isspace()
+                    yield filtered_text
+                pending_space = ''
+
+            pending_space = (pending_space + self._filter(chunk[len(body):]))[:1]
+
+def _strip_marks_chunks(chunks: Iterable[str]) -> Iterator[str]:
+    # trailing combining chars may still be reordered with the next chunk
+    carry: str = ''
+    for chunk in chunks:
+        stripped_text: str = _strip_marks(carry + chunk)
+        split: int = len(stripped_text)
+        while split > 0 and unicodedata.combining(stripped_text[split-1]): split -= 1
+        carry = stripped_text[split:]
+        if split > 0: yield stripped_text[:split]
+
+    if len(carry) > 0: yield carry
+
+@lru_cache(maxsize=128)
+def _compile_normalizer(black_list: tuple[str, ...], char_map: tuple[tuple[str, str], ...] | None) -> Normalizer:
+    return Normalizer(list(black_list), dict(char_map) if char_map is not None else None)
+
+def compile_normalizer(black_list: list[str] | None = None, char_map: dict[str, str] | None = None) -> Normalizer:
+    if black_list is None: black_list = list(DEFAULT_BLACK_LIST)
+    return _compile_normalizer(
+        tuple(black_list),
+        tuple(char_map.items()) if char_map is not None else None
+    )
+
 def normalize_text(input_text: str, black_list: list[str] | None = None, char_map: dict[str, str] | None = None) -> str:
     if len(input_text) <= 0: return input_text
-    if black_list is None: black_list = ['\n', '\t', '\r']
-
-    normalized_text: list[str] = [
-        c.lower() for c in input_text.strip()
-        if c not in black_list and (c.isalnum() or c.isspace())
-    ]
-
-    normalized_text = [
-        c for i, c in enumerate(normalized_text)
-        if not c.isspace() or (i == 0 or not normalized_text[i-1].isspace())
-    ]
+    return compile_normalizer(black_list, char_map)(input_text)
 
-    if char_map is not None:
-        normalized_text = list(replace_char_map_keys(''.join(normalized_text), char_map))
+def normalize_text_chunks(chunks: Iterable[str], black_list: list[str] | None = None, char_map: dict[str, str] | None = None) -> Iterator[str]:
+    return compile_normalizer(black_list, char_map).stream(chunks)
 
-    normalized_text = [
-        c for c in unicodedata.normalize('NFD', ''.join(normalized_text))
-        if unicodedata.category(c) != 'Mn'
-    ]
+def read_chunks(file: TextIO, chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    while chunk := file.read(chunk_size):
+        yield chunk
 
-    return ''.join(normalized_text)
+def decode_chunks(file: BinaryIO, chunk_size: int = CHUNK_SIZE, encoding: str = "utf-8") -> Iterator[str]:
+    # the incremental decoder keeps multibyte sequences split between chunks
+    decoder: codecs.IncrementalDecoder = codecs.getincrementaldecoder(encoding)()
+    while chunk := file.read(chunk_size):
+        decoded_text: str = decoder.decode(chunk)
+        if len(decoded_text) > 0: yield decoded_text
 
-def normalize_spaces(input_text: str) -> str:
-    if len(input_text) <= 0: return input_text
-    result: list[str] = []
-    
-    result = [
-        c for i, c in enumerate(input_text)
-        if not c.isspace() or (i == 0 or not input_text[i-1].isspace())
-    ]
+    decoded_text = decoder.decode(b'', final=True)
+    if len(decoded_text) > 0: yield decoded_text
 
-    for i in range(len(input_text)):
-        if input_text[i].isspace():
-            try: 
-                space_code = ('x' + unicodedata.name(' ') + 'x').lower()
-                result.append(space_code)
-            except: pass
-            continue
+def transform_file(source: str | os.PathLike | BinaryIO, target: str | os.PathLike | BinaryIO,
+                   transform: Callable[[Iterable[str]], Iterator[str]], chunk_size: int = CHUNK_SIZE) -> int:
+    # streams the decoded source through transform into target as utf-8 and returns the bytes written,
+    # paths are opened and closed here, streams are left open for the caller
+    with ExitStack() as stack:
+        if isinstance(source, (str, os.PathLike)): source = stack.enter_context(open(source, "rb"))
+        if isinstance(target, (str, os.PathLike)): target = stack.enter_context(open(target, "wb"))
 
-        result.append(input_text[i])
+        written: int = 0
+        for chunk in transform(decode_chunks(source, chunk_size)):
+            written += target.write(chunk.encode("utf-8"))
+        return written
 
-    return ''.join(result)
+def get_space_code() -> str:
+    return ('x' + unicodedata.name(' ') + 'x').lower()
 
-def get_char_map() -> dict[str, str]:
+def normalize_spaces(input_text: str) -> str:
+    if len(input_text) <= 0: return input_text
+    return _spaces.sub(get_space_code(), input_text)
+
+def normalize_spaces_chunks(chunks: Iterable[str]) -> Iterator[str]:
+    space_code: str = get_space_code()
+    last_is_space: bool = False
+    for chunk in chunks:
+        if last_is_space: chunk = chunk.lstrip()
+        if len(chunk) <= 0: continue
+        last_is_space = chunk[-1].isspace()
+        yield _spaces.sub(space_code, chunk)
+
+def _build_char_map() -> dict[str, str]:
     char_map: dict[str, str] = {
         str(i): 'x' + unicodedata.name(str(i)).lower().replace("digit", '').replace(' ', '') + 'x' 
         for i in range(10)
@@ -60,7 +245,7 @@ def get_char_map() -> dict[str, str]:
     char_map[' '] = 'x' + unicodedata.name(' ').lower() + 'x'
     return char_map
 
-def get_nonrepeating_char_map() -> dict[str, str]:
+def _build_nonrepeating_char_map() -> dict[str, str]:
     char_map: dict[str, str] = {
         str(i): 'x' + format_repeating_chars(
             unicodedata.name(str(i)).lower().replace("digit", '').replace(' ', '')
@@ -70,49 +255,225 @@ def get_nonrepeating_char_map() -> dict[str, str]:
     char_map[' '] = 'x' + unicodedata.name(' ').lower() + 'x'
     return char_map
 
+def _build_space_char_map() -> dict[str, str]:
+    # digits are left as they are for alphabets that have them
+    return {' ': 'x' + unicodedata.name(' ').lower() + 'x'}
+
+def _build_deleting_char_map() -> dict[str, str]:
+    char_map: dict[str, str] = {str(i): '' for i in range(10)}
+    char_map[' '] = ''
+    return char_map
+
+def get_char_map() -> dict[str, str]:
+    return dict(get_codec("char_map").char_map)
+
+def get_nonrepeating_char_map() -> dict[str, str]:
+    return dict(get_codec("nonrepeating_char_map").char_map)
+
+def get_space_char_map() -> dict[str, str]:
+    return dict(get_codec("space_char_map").char_map)
+
 def get_deleting_char_map(chars: list[str] | None = None) -> dict[str, str]:
     if chars is not None:
         char_map: dict[str, str] = {c: '' for c in chars}
         return char_map
 
-    char_map: dict[str, str] = {str(i): '' for i in range(10)}
-    char_map[' '] = ''
-    return char_map
+    return dict(get_codec("deleting_char_map").char_map)
+
+def _trie_pattern(keys: Iterable[str]) -> str:
+    # keys sharing a prefix share a branch, extending a match is tried before ending it
+    trie: dict[str, dict] = {}
+    for key in keys:
+        node: dict[str, dict] = trie
+        for c in key: node = node.setdefault(c, {})
+        node[''] = {}
+
+    def node_pattern(node: dict[str, dict]) -> str:
+        branches: list[str] = [re.escape(c) + node_pattern(child) for c, child in node.items() if c != '']
+        if '' in node: branches.append('')
+        if len(branches) == 1: return branches[0]
+        return '(?:' + '|'.join(branches) + ')'
+
+    return node_pattern(trie)
+
+class CharMapMatcher:
+    # replaces every key in one left to right pass, the longest key wins at each position
+    __slots__ = ("replacements", "max_length", "_pattern")
+
+    def __init__(self, replacements: dict[str, str]) -> None:
+        self.replacements: dict[str, str] = {k: v for k, v in replacements.items() if len(k) > 0}
+        self.max_length: int = max(map(len, self.replacements), default=0)
+        self._pattern: re.Pattern[str] | None = None
+        if len(self.replacements) > 0:
+            self._pattern = re.compile('(' + _trie_pattern(self.replacements) + ')')
+
+    def _replace_parts(self, parts: list[str]) -> str:
+        # split with a capturing group puts the matched keys at the odd indices
+        parts[1::2] = map(self.replacements.__getitem__, parts[1::2])
+        return ''.join(parts)
+
+    def replace(self, input_text: str) -> str:
+        if self._pattern is None or len(input_text) <= 0: return input_text
+        return self._replace_parts(self._pattern.split(input_text))
+
+    def replace_chunks(self, chunks: Iterable[str]) -> Iterator[str]:
+        if self._pattern is None:
+            yield from chunks
+            return
+
+        carry: str = ''
+        for chunk in chunks:
+            buffer: str = carry + chunk
+            # matches starting before the limit already see every key that could start there
+            limit: int = len(buffer) - self.max_length + 1
+            if limit <= 0:
+                carry = buffer
+                continue
+
+            parts: list[str] = self._pattern.split(buffer)
+            i: int = len(parts) - 1
+            match_end: int = len(buffer) - len(parts[i])
+            while i > 0 and match_end - len(parts[i-1]) >= limit:
+                match_end -= len(parts[i-1]) + len(parts[i-2])
+                i -= 2
+
+            split: int = max(limit, match_end)
+            replaced_text: str = self._replace_parts(parts[:i]) + parts[i][:split - match_end]
+            carry = buffer[split:]
+            if len(replaced_text) > 0: yield replaced_text
+
+        if len(carry) > 0: yield self.replace(carry)
+
+@lru_cache(maxsize=128)
+def _compile_char_map_matcher(char_map: tuple[tuple[str, str], ...], reverse: bool) -> CharMapMatcher:
+    if not reverse: return CharMapMatcher(dict(char_map))
+
+    # sequential replaces let the first key of a shared value win, keep that
+    replacements: dict[str, str] = {}
+    for key, value in char_map: replacements.setdefault(value, key)
+    return CharMapMatcher(replacements)
+
+def compile_char_map_matcher(char_map: dict[str, str], reverse: bool = False) -> CharMapMatcher:
+    return _compile_char_map_matcher(tuple(char_map.items()), reverse)
 
 def replace_char_map_keys(input_text: str, char_map: dict[str, str]) -> str:
     if len(input_text) <= 0: return input_text
-    for key, value in char_map.items():
-        input_text = input_text.replace(key, value)
+    return compile_char_map_matcher(char_map).replace(input_text)
 
-    return input_text
+def replace_char_map_keys_chunks(chunks: Iterable[str], char_map: dict[str, str]) -> Iterator[str]:
+    return compile_char_map_matcher(char_map).replace_chunks(chunks)
 
 def replace_char_map_values(input_text: str, char_map: dict[str, str] | None = None) -> str:
     if len(input_text) <= 0: return input_text
     if char_map is None: char_map = get_char_map()
-    for key, value in char_map.items():
-        input_text = input_text.replace(value, key)
-
-    return input_text
+    return compile_char_map_matcher(char_map, reverse=True).replace(input_text)
 
-def groups_of(input_text: str, length: int) -> str:
+def replace_char_map_values_chunks(chunks: Iterable[str], char_map: dict[str, str] | None = None) -> Iterator[str]:
+    if char_map is None: char_map = get_char_map()
+    return compile_char_map_matcher(char_map, reverse=True).replace_chunks(chunks)
+
+class CharMapCodec(NamedTuple):
+    name: str
+    char_map: Mapping[str, str]
+    reverse_map: Mapping[str, str]
+    encoder: CharMapMatcher
+    decoder: CharMapMatcher
+    normalizer: Normalizer
+
+    def encode(self, input_text: str) -> str:
+        return self.encoder.replace(input_text)
+
+    def decode(self, input_text: str) -> str:
+        return self.decoder.replace(input_text)
+
+    def encode_chunks(self, chunks: Iterable[str]) -> Iterator[str]:
+        return self.encoder.replace_chunks(chunks)
+
+    def decode_chunks(self, chunks: Iterable[str]) -> Iterator[str]:
+        return self.decoder.replace_chunks(chunks)
+
+    def normalize(self, input_text: str) -> str:
+        return self.normalizer(input_text)
+
+_builtin_char_maps: dict[str, Callable[[], dict[str, str]]] = {
+    "char_map": _build_char_map,
+    "nonrepeating_char_map": _build_nonrepeating_char_map,
+    "space_char_map": _build_space_char_map,
+    "deleting_char_map": _build_deleting_char_map,
+}
+_codecs: dict[str, CharMapCodec] = {}
+
+def register_codec(name: str, char_map: Mapping[str, str]) -> CharMapCodec:
+    items: tuple[tuple[str, str], ...] = tuple(char_map.items())
+    codec: CharMapCodec = CharMapCodec(
+        name,
+        MappingProxyType(dict(items)),
+        MappingProxyType(dict((value, key) for key, value in reversed(items))),
+        _compile_char_map_matcher(items, False),
+        _compile_char_map_matcher(items, True),
+        compile_normalizer(char_map=dict(items)),
+    )
+    _codecs[name] = codec
+    return codec
+
+def get_codec(name: str) -> CharMapCodec:
+    codec: CharMapCodec | None = _codecs.get(name)
+    if codec is not None: return codec
+    if name not in _builtin_char_maps: raise KeyError(f"unknown char map: {name}")
+    return register_codec(name, _builtin_char_maps[name]())
+
+def _format_groups(input_text: str, length: int, groups_per_line: int = 0) -> str:
+    groups: list[str] = [input_text[i:i+length] for i in range(0, len(input_text), length)]
+    if groups_per_line <= 0: return ' '.join(groups)
+    return '\n'.join(
+        ' '.join(groups[i:i+groups_per_line])
+        for i in range(0, len(groups), groups_per_line)
+    )
+
+def groups_of(input_text: str, length: int, groups_per_line: int = 0) -> str:
     if len(input_text) <= 0: return input_text
-    return ''.join([
-        c if i == 0 or i % length != 0
-        else f' {c}'
-        for i, c in enumerate(input_text)
-    ])
+    return _format_groups(input_text, length, groups_per_line)
+
+def groups_of_chunks(chunks: Iterable[str], length: int, groups_per_line: int = 0) -> Iterator[str]:
+    # chunks are formatted in whole lines (whole groups without wrapping), the rest waits for the next chunk
+    unit: int = length * groups_per_line if groups_per_line > 0 else length
+    separator: str = '\n' if groups_per_line > 0 else ' '
+    started: bool = False
+    carry: str = ''
+
+    for chunk in chunks:
+        buffer: str = carry + chunk
+        split: int = len(buffer) - len(buffer) % unit
+        carry = buffer[split:]
+        if split <= 0: continue
+
+        if started: yield separator
+        started = True
+        yield _format_groups(buffer[:split], length, groups_per_line)
+
+    if len(carry) <= 0: return
+    if started: yield separator
+    yield _format_groups(carry, length, groups_per_line)
+
+def write_groups(chunks: Iterable[str], sink: TextIO, length: int, groups_per_line: int = 0) -> int:
+    written: int = 0
+    for formatted_text in groups_of_chunks(chunks, length, groups_per_line):
+        written += sink.write(formatted_text)
+    return written
 
 def format_repeating_chars(input_text: str) -> str:
     if len(input_text) < 2: return input_text
-
-    result: list[str] = []
-    for i in range(len(input_text)):
-        result.append(input_text[i])
-        if i < len(input_text) - 1 and input_text[i] == input_text[i+1]:
-            sub_char: str = 'x' if input_text[i] != 'x' else 'q'
-            result.append(sub_char)
-
-    return ''.join(result)
+    # the x fillers never end up next to another x, so the passes do not interfere
+    input_text = _repeated_chars.sub(r'\1x', input_text)
+    return _repeated_xs.sub('xq', input_text)
+
+def format_repeating_chars_chunks(chunks: Iterable[str]) -> Iterator[str]:
+    last_char: str = ''
+    for chunk in chunks:
+        if len(chunk) <= 0: continue
+        if chunk[0] == last_char: yield 'x' if last_char != 'x' else 'q'
+        last_char = chunk[-1]
+        yield format_repeating_chars(chunk)
 
 # todo: make better
 def revert_repeating_chars(input_text: str, char_map: dict[str, str] | None = None) -> str:
@@ -128,6 +489,9 @@ def revert_repeating_chars(input_text: str, char_map: dict[str, str] | None = No
 
     return ''.join(result).replace('xqx', 'xx')
 
+def revert_repeating_chars_chunks(chunks: Iterable[str]) -> Iterator[str]:
+    return CharMapMatcher({'xqx': 'xx'}).replace_chunks(chunks)
+
 def even_length(input_text: str) -> str:
     if len(input_text) <= 0: return input_text
     if len(input_text) % 2 != 0:
@@ -136,6 +500,17 @@ def even_length(input_text: str) -> str:
 
     return input_text
 
+def even_length_chunks(chunks: Iterable[str]) -> Iterator[str]:
+    length: int = 0
+    last_char: str = ''
+    for chunk in chunks:
+        if len(chunk) <= 0: continue
+        length += len(chunk)
+        last_char = chunk[-1]
+        yield chunk
+
+    if length % 2 != 0: yield 'x' if last_char != 'x' else 'q'
+
 def revert_even_length(input_text: str) -> str:
     if len(input_text) <= 0: return input_text
     if len(input_text) % 2 != 0: return input_text
@@ -148,4 +523,19 @@ def revert_even_length(input_text: str) -> str:
 
     return input_text
 
+def revert_even_length_chunks(chunks: Iterable[str]) -> Iterator[str]:
+    # the filler can only be one of the last two chars, everything before them is final
+    length: int = 0
+    carry: str = ''
+    for chunk in chunks:
+        if len(chunk) <= 0: continue
+        length += len(chunk)
+        buffer: str = carry + chunk
+        carry = buffer[-2:]
+        if len(buffer) > 2: yield buffer[:-2]
+
+    if len(carry) <= 0: return
+    if length % 2 == 0 and (carry[-1] == 'x' or carry == 'xq'): carry = carry[:-1]
+    if len(carry) > 0: yield carry
+
 if __name__ == "__main__": main()